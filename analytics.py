@@ -0,0 +1,246 @@
+"""Streaming statistics over match logs written by matchlog.py.
+
+Records are read in fixed-size chunks and folded into a MatchStats one
+match at a time, so memory stays flat however large the log is:
+
+    iter_records -> iter_matches -> MatchStats.update
+
+A checkpoint file stores the stats so far plus the byte offset after the
+last finished match of each log, so a rerun only reads what was appended
+since. Large logs can be split across processes by byte range; each worker
+starts at the first START record of its range and the partial stats are
+merged.
+
+    python analytics.py ~/.ecard/matches.log --checkpoint stats.ckpt --json stats.json --csv stats.csv
+    python analytics.py big.log --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+from multiprocessing import Pool
+
+import engine
+import matchlog
+from matchlog import END, INDEX, RECORD, ROLES, ROUND, START
+
+
+class MatchStats:
+    def __init__(self):
+        self.matches = 0
+        self.abandoned = 0
+        self.by_role = {role: [0, 0, 0] for role in ROLES}  # [player wins, cpu wins, draws]
+        self.end_round = {}  # rounds played -> matches that ended there
+        self.leads = {role: [0, 0] for role in ROLES}  # [opened with the special card, matches]
+        self.cpu_by_session = {}  # session -> [matches, cpu wins]
+
+    def update(self, session, role, rounds, outcome, abandoned):
+        self.matches += 1
+        if abandoned:
+            self.abandoned += 1
+            return
+        self.by_role[role][(engine.PLAYER, engine.CPU, engine.DRAW).index(outcome)] += 1
+        self.end_round[len(rounds)] = self.end_round.get(len(rounds), 0) + 1
+        if rounds:
+            self.leads[role][0] += rounds[0][0] != engine.CITIZEN
+            self.leads[role][1] += 1
+        per_session = self.cpu_by_session.setdefault(session, [0, 0])
+        per_session[0] += 1
+        per_session[1] += outcome == engine.CPU
+
+    def merge(self, other):
+        self.matches += other.matches
+        self.abandoned += other.abandoned
+        for role in ROLES:
+            self.by_role[role] = [a + b for a, b in zip(self.by_role[role], other.by_role[role])]
+            self.leads[role] = [a + b for a, b in zip(self.leads[role], other.leads[role])]
+        for k, v in other.end_round.items():
+            self.end_round[k] = self.end_round.get(k, 0) + v
+        for session, (n, wins) in other.cpu_by_session.items():
+            mine = self.cpu_by_session.setdefault(session, [0, 0])
+            mine[0] += n
+            mine[1] += wins
+        return self
+
+    def to_dict(self):
+        return {
+            "matches": self.matches,
+            "abandoned": self.abandoned,
+            "by_role": self.by_role,
+            "end_round": {str(k): v for k, v in sorted(self.end_round.items())},
+            "leads": self.leads,
+            "cpu_by_session": {str(k): v for k, v in sorted(self.cpu_by_session.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.matches = data["matches"]
+        stats.abandoned = data["abandoned"]
+        stats.by_role = data["by_role"]
+        stats.end_round = {int(k): v for k, v in data["end_round"].items()}
+        stats.leads = data["leads"]
+        stats.cpu_by_session = {int(k): v for k, v in data["cpu_by_session"].items()}
+        return stats
+
+    def report(self):
+        # Derived rates, the shape written to JSON/CSV
+        rows = []
+        for role in ROLES:
+            wins, losses, draws = self.by_role[role]
+            total = wins + losses + draws
+            if total:
+                rows.append(("win_rate", role, wins / total))
+                rows.append(("draw_rate", role, draws / total))
+            special, played = self.leads[role]
+            if played:
+                rows.append(("lead_with_special", role, special / played))
+        finished = sum(self.end_round.values())
+        for k, v in sorted(self.end_round.items()):
+            rows.append(("ended_after_round", k, v / finished))
+        for session, (n, wins) in sorted(self.cpu_by_session.items()):
+            rows.append(("cpu_win_rate_by_session", session, wins / n))
+        rows.append(("matches", "", self.matches))
+        rows.append(("abandoned", "", self.abandoned))
+        return rows
+
+
+def iter_index(path, start_offset=0):
+    # (session, match, offset) for every index entry at or after start_offset, read in chunks
+    try:
+        f = open(path + ".idx", "rb")
+    except OSError:
+        return
+    with f:
+        count = f.seek(0, os.SEEK_END) // INDEX.size
+        # Binary search over the fixed-width entries for the first one >= start_offset
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(mid * INDEX.size)
+            if INDEX.unpack(f.read(INDEX.size))[2] < start_offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        f.seek(lo * INDEX.size)
+        while True:
+            chunk = f.read(INDEX.size * 4096)
+            if not chunk:
+                return
+            yield from INDEX.iter_unpack(chunk[:len(chunk) - len(chunk) % INDEX.size])
+
+
+def iter_matches(path, start=0, stop=None, resume=None):
+    """Yield (session, role, rounds, outcome, abandoned) for matches whose START is in [start, stop).
+
+    resume, if given, is a one-item list that ends up holding the offset a
+    later run should continue from: the START of a trailing unfinished
+    match, otherwise the end of what was read."""
+    index = iter_index(path, start)
+    entry = next(index, None)
+    current = None
+    resume_at = start
+    for offset, kind, a, b in matchlog.iter_records(path, start):
+        if kind == START:
+            if current is not None:
+                # START without END: the game was closed mid-match
+                yield current[0], current[1], current[2], engine.DRAW, True
+                current = None
+            if stop is not None and offset >= stop:
+                break
+            while entry is not None and entry[2] < offset:
+                entry = next(index, None)
+            session = entry[0] if entry is not None and entry[2] == offset else 0
+            current = [session, ROLES[a], [], offset]
+        elif current is None:
+            pass  # a range can open mid-match; that match belongs to the previous range
+        elif kind == ROUND:
+            current[2].append((a & 3, a >> 2 & 3, a >> 4 & 3))
+        elif kind == END:
+            yield current[0], current[1], current[2], a & 3, bool(a >> 2 & 1)
+            current = None
+        resume_at = current[3] if current is not None else offset + RECORD.size
+    if resume is not None:
+        resume[0] = resume_at
+
+
+def aggregate(path, start=0, stop=None):
+    stats = MatchStats()
+    resume = [start]
+    for match in iter_matches(path, start, stop, resume):
+        stats.update(*match)
+    return stats, resume[0]
+
+
+def _aggregate_range(args):
+    return aggregate(*args)
+
+
+def split_ranges(start, end, parts):
+    step = max(RECORD.size, (end - start) // parts)
+    step -= step % RECORD.size
+    bounds = list(range(start, end, step))[:parts] + [end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def run(paths, checkpoint=None, workers=1):
+    state = {}
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            state = json.load(f)
+    total = MatchStats.from_dict(state["stats"]) if "stats" in state else MatchStats()
+    offsets = state.get("offsets", {})
+    for path in paths:
+        key = os.path.abspath(path)
+        start = offsets.get(key, 0)
+        end = os.path.getsize(path)
+        end -= end % RECORD.size
+        if start >= end:
+            continue
+        if workers > 1:
+            ranges = split_ranges(start, end, workers)
+            with Pool(workers) as pool:
+                results = pool.map(_aggregate_range, [(path, a, b) for a, b in ranges[:-1]] +
+                                   [(path, ranges[-1][0], None)])
+            for stats, _ in results:
+                total.merge(stats)
+            offsets[key] = results[-1][1]
+        else:
+            stats, offsets[key] = aggregate(path, start)
+            total.merge(stats)
+    if checkpoint:
+        tmp = checkpoint + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"stats": total.to_dict(), "offsets": offsets}, f)
+        os.replace(tmp, checkpoint)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aggregate E-Card match logs")
+    parser.add_argument("logs", nargs="*", default=[os.path.join(matchlog.default_log_dir(), matchlog.DEFAULT_NAME)])
+    parser.add_argument("--checkpoint", help="resume from / save to this file")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--json", help="write the raw aggregates and derived rates here")
+    parser.add_argument("--csv", help="write derived rates as metric,key,value rows here")
+    args = parser.parse_args(argv)
+
+    stats = run(args.logs, args.checkpoint, args.workers)
+    rows = stats.report()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"aggregates": stats.to_dict(),
+                       "rates": [{"metric": m, "key": k, "value": v} for m, k, v in rows]}, f, indent=2)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(("metric", "key", "value"))
+            writer.writerows(rows)
+    if not (args.json or args.csv):
+        for metric, key, value in rows:
+            print(f"{metric:<26} {key!s:<8} {value:.4f}" if isinstance(value, float) else
+                  f"{metric:<26} {key!s:<8} {value}")
+
+
+if __name__ == "__main__":
+    main()
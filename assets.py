@@ -0,0 +1,152 @@
+"""Single memory-mapped bundle of pre-decoded card bitmaps and PCM audio.
+
+The build step decodes every card once, at 120x180 and at each width the
+flip animation uses, as raw RGBA, and converts every WAV into the mixer's
+own sample format. Everything goes into one file:
+
+    b"ECB1" | u32 index length | JSON index | 16-byte aligned blobs
+
+At runtime the file is memory-mapped and PIL / pygame get views of it, so
+nothing is decoded or extracted. ECardApp falls back to the loose .jpg/.wav
+files when there is no bundle.
+
+    python assets.py -o assets.bundle
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+
+from PIL import Image
+
+BUNDLE_NAME = "assets.bundle"
+MAGIC = b"ECB1"
+ALIGN = 16
+
+CARD_SIZE = (120, 180)
+FLIP_STEPS = 8
+# Mixer format the PCM blobs are converted to (44.1 kHz, signed 16-bit, stereo)
+MIXER_FORMAT = (44100, -16, 2)
+
+CARD_FILES = {"Emperor": "emperor.jpg", "Citizen": "citizen.jpg", "Slave": "slave.jpg", "Back": "back.jpg"}
+# The theme is streamed by pygame.mixer.music from its file, so only effects are bundled
+SOUND_FILES = {k: k + ".wav" for k in ("flip", "win", "lose", "draw", "click")}
+
+
+def flip_widths(width=CARD_SIZE[0], steps=FLIP_STEPS):
+    # Every frame width flip_frames() produces for a card of this width
+    shrink = {max(1, int(width * (1 - i / steps))) for i in range(steps)}
+    grow = {max(1, int(width * (i + 1) / steps)) for i in range(steps)}
+    return sorted(shrink | grow)
+
+
+def image_key(name, size):
+    return f"image/{name}/{size[0]}x{size[1]}"
+
+
+def sound_key(name):
+    return f"sound/{name}"
+
+
+def build_bundle(out_path, source_dir=".", steps=FLIP_STEPS):
+    # Returns the index that was written
+    blobs = []
+    index = {"mixer": list(MIXER_FORMAT), "entries": {}}
+
+    for name, filename in CARD_FILES.items():
+        full = Image.open(os.path.join(source_dir, filename)).resize(CARD_SIZE).convert("RGBA")
+        for w in flip_widths(CARD_SIZE[0], steps):
+            img = full if w == CARD_SIZE[0] else full.resize((w, CARD_SIZE[1]))
+            blobs.append((image_key(name, img.size), {"kind": "image", "mode": "RGBA", "size": list(img.size)},
+                          img.tobytes()))
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    pygame.mixer.init(*MIXER_FORMAT)
+    try:
+        for name, filename in SOUND_FILES.items():
+            path = os.path.join(source_dir, filename)
+            if not os.path.exists(path):
+                continue
+            # pygame converts to the mixer format on load, so get_raw() is ready-to-play PCM
+            pcm = pygame.mixer.Sound(path).get_raw()
+            blobs.append((sound_key(name), {"kind": "pcm"}, pcm))
+    finally:
+        pygame.mixer.quit()
+
+    # Offsets are relative to the first aligned byte after the index
+    offset = 0
+    for key, meta, data in blobs:
+        offset = -(-offset // ALIGN) * ALIGN
+        meta.update(offset=offset, length=len(data))
+        index["entries"][key] = meta
+        offset += len(data)
+    index_bytes = json.dumps(index).encode()
+    data_start = -(-(len(MAGIC) + 4 + len(index_bytes)) // ALIGN) * ALIGN
+    index_bytes += b" " * (data_start - len(MAGIC) - 4 - len(index_bytes))
+
+    with open(out_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(index_bytes)) + index_bytes)
+        for key, meta, data in blobs:
+            f.seek(data_start + meta["offset"])
+            f.write(data)
+    return index
+
+
+class AssetBundle:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:4] != MAGIC:
+            raise ValueError(f"{path} is not an E-Card asset bundle")
+        (index_len,) = struct.unpack_from("<I", self._mmap, 4)
+        self._data_start = 8 + index_len
+        index = json.loads(bytes(self._mmap[8:self._data_start]))
+        self.entries = index["entries"]
+        self.mixer_format = tuple(index["mixer"])
+        self._view = memoryview(self._mmap)
+
+    def view(self, key):
+        # Zero-copy memoryview of one blob, or None
+        meta = self.entries.get(key)
+        if meta is None:
+            return None
+        start = self._data_start + meta["offset"]
+        return self._view[start:start + meta["length"]]
+
+    def image(self, name, size=CARD_SIZE):
+        meta = self.entries.get(image_key(name, size))
+        if meta is None:
+            return None
+        # RGBA frombuffer shares memory with the mapping instead of copying
+        return Image.frombuffer(meta["mode"], tuple(meta["size"]), self.view(image_key(name, size)),
+                                "raw", meta["mode"], 0, 1)
+
+    def sound(self, name, mixer):
+        # Only valid when the mixer runs in the bundle's format
+        pcm = self.view(sound_key(name))
+        if pcm is None or mixer.get_init() != self.mixer_format:
+            return None
+        return mixer.Sound(buffer=pcm)
+
+
+def open_bundle(path):
+    # None when there is no usable bundle, so callers fall back to the loose files
+    try:
+        return AssetBundle(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack card images and sounds into one asset bundle")
+    parser.add_argument("-o", "--output", default=BUNDLE_NAME)
+    parser.add_argument("--source", default=".", help="directory with the .jpg/.wav files")
+    args = parser.parse_args(argv)
+    index = build_bundle(args.output, args.source)
+    print(f"Wrote {args.output}: {len(index['entries'])} entries, {os.path.getsize(args.output):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Audio service: every sound request goes through one queue and one worker.
+
+The Tk thread only enqueues (play, volume, music) requests; a worker thread
+owns the mixer and services them. Each effect class gets its own reserved
+mixer channels, so a burst of flips can never cut off a win/lose sting.
+Repeated volume changes (a dragged slider) collapse into one update.
+
+Backends:
+    PygameBackend  pygame.mixer, optionally fed from the asset bundle
+    NullBackend    silent, keeps no device; used with ECARD_AUDIO=null or
+                   whenever the mixer cannot be opened
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+# Effect class -> (sound keys, reserved channels)
+CHANNEL_CLASSES = {
+    "ui": (("click",), 1),
+    "card": (("flip",), 2),
+    "result": (("win", "lose", "draw"), 1),
+}
+
+
+class NullBackend:
+    name = "null"
+
+    def __init__(self):
+        self.played = deque(maxlen=1000)  # recent (channel, key) plays; bounded for long sessions
+        self.volume = {}
+        self.music = None
+
+    def open(self, channel_count, bundle=None):
+        return True
+
+    def load(self, key, path):
+        return True
+
+    def play(self, channel, key):
+        self.played.append((channel, key))
+
+    def set_volume(self, key, volume):
+        self.volume[key] = volume
+
+    def play_music(self, path, volume):
+        self.music = path
+
+    def stop_music(self):
+        self.music = None
+
+    def set_music_volume(self, volume):
+        self.volume["music"] = volume
+
+
+class PygameBackend:
+    name = "pygame"
+
+    def __init__(self):
+        self.mixer = None
+        self.sounds = {}
+        self.bundle = None
+
+    def open(self, channel_count, bundle=None):
+        try:
+            import pygame
+            # Run the mixer in the bundle's sample format so its PCM can be played as-is
+            pygame.mixer.init(*(bundle.mixer_format if bundle else ()))
+            pygame.mixer.set_num_channels(max(8, channel_count))
+            pygame.mixer.set_reserved(channel_count)
+        except Exception:
+            return False
+        self.mixer = pygame.mixer
+        self.bundle = bundle
+        return True
+
+    def load(self, key, path):
+        try:
+            self.sounds[key] = (self.bundle and self.bundle.sound(key, self.mixer)) or self.mixer.Sound(path)
+            return True
+        except Exception:
+            return False
+
+    def play(self, channel, key):
+        sound = self.sounds.get(key)
+        if sound is not None:
+            self.mixer.Channel(channel).play(sound)
+
+    def set_volume(self, key, volume):
+        sound = self.sounds.get(key)
+        if sound is not None:
+            sound.set_volume(volume)
+
+    def play_music(self, path, volume):
+        try:
+            self.mixer.music.load(path)
+            self.mixer.music.set_volume(volume)
+            self.mixer.music.play(-1)
+        except Exception:
+            pass
+
+    def stop_music(self):
+        self.mixer.music.stop()
+
+    def set_music_volume(self, volume):
+        self.mixer.music.set_volume(volume)
+
+
+class AudioService:
+    def __init__(self, sounds, backend=None, bundle=None, effects_volume=1.0, on_phase=None):
+        # sounds: key -> file path for every effect; on_phase(name, start) gets startup timings
+        self.sounds = sounds
+        if backend is None:
+            backend = NullBackend() if os.environ.get("ECARD_AUDIO") == "null" else PygameBackend()
+        self.backend = backend
+        self.bundle = bundle
+        self.effects_volume = effects_volume
+        self.on_phase = on_phase
+        self.ready = threading.Event()
+        self.latencies = deque(maxlen=1000)  # seconds from request to channel start
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending_effects_volume = None
+        self._pending_music_volume = None
+        self._channels = {}  # key -> (effect class, first channel, channel count)
+        self._next = {}  # effect class -> round robin offset within its channels
+        first = 0
+        for effect_class, (keys, count) in CHANNEL_CLASSES.items():
+            for key in keys:
+                self._channels[key] = (effect_class, first, count)
+            self._next[effect_class] = 0
+            first += count
+        self._channel_count = first
+        self._thread = None
+        self._ready_at = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._queue.put(None)
+
+    # Tk thread side: everything below only enqueues
+
+    def play(self, key):
+        self._queue.put(("play", key, time.perf_counter()))
+
+    def play_music(self, path, volume):
+        self._queue.put(("music", (path, volume), None))
+
+    def stop_music(self):
+        self._queue.put(("stop_music", None, None))
+
+    def set_effects_volume(self, volume):
+        with self._lock:
+            queued = self._pending_effects_volume is not None
+            self._pending_effects_volume = volume
+        if not queued:
+            self._queue.put(("effects_volume", None, None))
+
+    def set_music_volume(self, volume):
+        with self._lock:
+            queued = self._pending_music_volume is not None
+            self._pending_music_volume = volume
+        if not queued:
+            self._queue.put(("music_volume", None, None))
+
+    # Worker side
+
+    def _open(self):
+        start = time.perf_counter()
+        if not self.backend.open(self._channel_count, self.bundle):
+            # No audio device: keep servicing the queue silently
+            self.backend = NullBackend()
+        if self.on_phase:
+            self.on_phase("mixer_init", start)
+        start = time.perf_counter()
+        for key, path in self.sounds.items():
+            if self.backend.load(key, path):
+                self.backend.set_volume(key, self.effects_volume)
+        if self.on_phase:
+            self.on_phase("sound_decode", start)
+        self._ready_at = time.perf_counter()
+        self.ready.set()
+
+    def _run(self):
+        self._open()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            kind, arg, requested = item
+            if kind == "play":
+                if arg not in self._channels:
+                    continue
+                effect_class, first, count = self._channels[arg]
+                channel = first + self._next[effect_class]
+                self._next[effect_class] = (self._next[effect_class] + 1) % count
+                self.backend.play(channel, arg)
+                # Requests queued during start-up count from when the mixer was ready
+                self.latencies.append(time.perf_counter() - max(requested, self._ready_at))
+            elif kind == "effects_volume":
+                with self._lock:
+                    volume, self._pending_effects_volume = self._pending_effects_volume, None
+                self.effects_volume = volume
+                for key in self.sounds:
+                    self.backend.set_volume(key, volume)
+            elif kind == "music_volume":
+                with self._lock:
+                    volume, self._pending_music_volume = self._pending_music_volume, None
+                self.backend.set_music_volume(volume)
+            elif kind == "music":
+                self.backend.play_music(*arg)
+            elif kind == "stop_music":
+                self.backend.stop_music()
+
+    def stats(self):
+        times = sorted(self.latencies)
+        result = {"backend": self.backend.name, "plays": len(times)}
+        if times:
+            result.update(p50_ms=times[len(times) // 2] * 1000, p99_ms=times[int(len(times) * 0.99)] * 1000,
+                          max_ms=times[-1] * 1000)
+        return result
@@ -0,0 +1,101 @@
+"""Widget renderer vs single-Canvas renderer: allocations and redraw time.
+
+For each renderer this switches between the role screen and a new game
+(what change_role and play_again do) and plays rounds, and reports widgets
+created per transition, live widgets and canvas items, and the time each
+step takes including Tk's redraw (update_idletasks).
+
+Runs unattended through harness.py (silent audio, temporary match log;
+needs a display).
+
+    python benchmarks/bench_render.py --transitions 200 --rounds 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk  # noqa: E402
+
+import harness  # noqa: E402  (before ecarddemo: silent audio and a temporary match log)
+import engine  # noqa: E402
+import ecarddemo  # noqa: E402
+from harness import canvas_items, live_widgets  # noqa: E402
+
+created = [0]
+_setup = tk.BaseWidget._setup
+
+
+def _counting_setup(self, master, cnf):
+    created[0] += 1
+    return _setup(self, master, cnf)
+
+
+tk.BaseWidget._setup = _counting_setup
+
+
+def bench(renderer, transitions, rounds):
+    root = tk.Tk()
+    app = ecarddemo.ECardApp(root, renderer=renderer)
+    root.update()
+
+    before = created[0]
+    start = time.perf_counter()
+    for i in range(transitions):
+        app.show_role_selection()
+        root.update_idletasks()
+        app.start_game(engine.ROLES[i & 1])
+        root.update_idletasks()
+    transition_s = (time.perf_counter() - start) / (2 * transitions)
+    transition_widgets = (created[0] - before) / (2 * transitions)
+
+    before = created[0]
+    samples = []
+    for i in range(rounds):
+        game = app.game
+        if engine.is_over(game.state):
+            app.start_game(game.role)
+            game = app.game
+        # The per-round view work play_round/reveal_cards do, without the timed pauses
+        start = time.perf_counter()
+        game.state, game.outcome = engine.step(game.state, engine.CITIZEN, engine.CITIZEN)
+        game.update_player_hand()
+        game.history.append(("Citizen", "Citizen"))
+        game.history_total += 1
+        game.update_sidebar()
+        game.result_label.config(text=f"Round {i}")
+        root.update_idletasks()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    result = {
+        "renderer": renderer,
+        "widgets_per_transition": transition_widgets,
+        "transition_ms": transition_s * 1000,
+        "widgets_per_round": (created[0] - before) / rounds,
+        "round_p50_us": samples[len(samples) // 2] * 1e6,
+        "round_p99_us": samples[int(len(samples) * 0.99)] * 1e6,
+        "live_widgets": live_widgets(root),
+        "canvas_items": canvas_items(root),
+    }
+    harness.close_app(app)
+    root.destroy()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transitions", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args(argv)
+    for renderer in ("widgets", "canvas"):
+        r = bench(renderer, args.transitions, args.rounds)
+        print(f"{r['renderer']:<8} transition {r['transition_ms']:7.2f} ms ({r['widgets_per_transition']:.1f} widgets)  "
+              f"round p50 {r['round_p50_us']:7.1f} us p99 {r['round_p99_us']:7.1f} us "
+              f"({r['widgets_per_round']:.2f} widgets)  live: {r['live_widgets']} widgets, "
+              f"{r['canvas_items']} canvas items")
+
+
+if __name__ == "__main__":
+    main()
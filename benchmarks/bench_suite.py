@@ -0,0 +1,338 @@
+"""Benchmark suite for the game: rules, CPU, flip frames, hand/sidebar updates and startup.
+
+Every metric is the median of --repeat runs (at least 5 for
+--save-baseline) and the whole result is written as JSON. With --baseline,
+each metric is compared with the stored run, and the exit status is 1 if
+any got worse by more than --threshold (a fraction, in whichever direction
+is worse for that metric; noisy metrics get their own wider tolerance in
+METRICS) or if a metric in the baseline was not measured, e.g. the GUI ones
+on a machine without a display (--allow-missing only lists those).
+
+The rules, CPU move, flip frame and click-to-sound benchmarks need no
+display. The rest drive a real ECardApp on a virtual clock (see
+guidriver.py) and need one (see harness.py); without it they are listed
+under "skipped".
+
+    xvfb-run python benchmarks/bench_suite.py --json bench.json
+    xvfb-run python benchmarks/bench_suite.py --baseline benchmarks/baseline.json --threshold 0.25
+    xvfb-run python benchmarks/bench_suite.py --save-baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import tkinter as tk  # noqa: E402
+
+from PIL import Image  # noqa: E402
+
+import harness  # noqa: E402  (before ecarddemo: silent audio and a temporary match log)
+import engine  # noqa: E402
+import ecarddemo  # noqa: E402
+import guidriver  # noqa: E402
+import mipcache  # noqa: E402
+import opponent  # noqa: E402
+import solver  # noqa: E402
+from audio import AudioService, NullBackend  # noqa: E402
+from flipcache import FlipFrameCache, flip_frames  # noqa: E402
+from scheduler import VirtualClock  # noqa: E402
+
+SIDEBAR_HISTORY = (10, 100, 500, 5000)  # history lengths update_sidebar is timed at
+
+# name -> (unit, higher is better, tolerance); a tolerance wider than --threshold is for metrics
+# whose run-to-run noise alone exceeds it, like the tail of a single thread hand-off
+METRICS = {
+    "rules_rounds_per_sec": ("rounds/s", True, None),
+    "cpu_move_p50_us": ("us", False, None),
+    "cpu_move_p99_us": ("us", False, None),
+    "flip_frames_ms": ("ms", False, None),
+    "audio_click_p50_us": ("us", False, None),
+    "audio_click_p99_us": ("us", False, 1.0),
+    "flip_cold_get_ms": ("ms", False, None),
+    "update_player_hand_us": ("us", False, None),
+    **{f"update_sidebar_us_at_{n}": ("us", False, None) for n in SIDEBAR_HISTORY},
+    "gui_rounds_per_sec": ("rounds/s", True, None),
+    "startup_first_paint_ms": ("ms", False, None),
+}
+BASELINE_REPEAT = 5  # fewest runs a saved baseline is the median of
+
+# Run in a fresh interpreter so imports and image decoding are paid the way a user pays them
+STARTUP_SCRIPT = """
+import json, tkinter as tk
+import harness, ecarddemo
+root = tk.Tk()
+app = ecarddemo.ECardApp(root)
+while "first_paint" not in app.startup_times:
+    root.update()
+print(json.dumps(app.startup_times))
+harness.close_app(app)
+root.destroy()
+"""
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def bench_rules(rounds):
+    # What play_round and reveal_cards do per round minus the view: the CPU's pick, the step
+    # and the adaptive model's update, with random player cards
+    strategy = solver.StrategyTable.load(os.path.join(ROOT, solver.DEFAULT_TABLE))
+    policy = opponent.OpponentModel(engine.HAND_SIZE, baseline=strategy)
+    rng = random.Random(0)
+    matches = 0
+    state = engine.new_match(engine.ROLES[0])
+    start = time.perf_counter()
+    for _ in range(rounds):
+        player = engine.random_player_card(state, rng)
+        next_state, _ = engine.step(state, player, policy.cpu_card(state, rng))
+        policy.observe(state, player)
+        state = next_state
+        if engine.is_over(state):
+            matches += 1
+            state = engine.new_match(engine.ROLES[matches & 1])
+    return {"rules_rounds_per_sec": rounds / (time.perf_counter() - start)}
+
+
+def bench_cpu_move(moves):
+    # Latency of one CPU decision, over every position of a match
+    strategy = solver.StrategyTable.load(os.path.join(ROOT, solver.DEFAULT_TABLE))
+    policy = opponent.OpponentModel(engine.HAND_SIZE, baseline=strategy)
+    rng = random.Random(1)
+    clock = time.perf_counter_ns
+    samples = []
+    state = engine.new_match(engine.ROLES[0])
+    for i in range(moves):
+        start = clock()
+        cpu = policy.cpu_card(state, rng)
+        samples.append(clock() - start)
+        state, _ = engine.step(state, engine.random_player_card(state, rng), cpu)
+        if engine.is_over(state):
+            state = engine.new_match(engine.ROLES[i & 1])
+    return {"cpu_move_p50_us": percentile(samples, 0.5) / 1000, "cpu_move_p99_us": percentile(samples, 0.99) / 1000}
+
+
+def bench_flip_frames(flips):
+    # PIL work for one flip_card_animation (both halves, 8 steps each) at the base card size,
+    # as FlipFrameCache builds it without the asset bundle
+    images = {name: Image.open(path).resize(mipcache.BASE_SIZE) for name, path in ecarddemo.card_paths.items()}
+    samples = []
+    for i in range(flips):
+        to_card = engine.CARD_NAMES[i % len(engine.CARD_NAMES)]
+        start = time.perf_counter()
+        flip_frames(images["Back"], images[to_card], 8)
+        samples.append(time.perf_counter() - start)
+    return {"flip_frames_ms": statistics.median(samples) * 1000}
+
+
+def bench_audio(plays):
+    # Click-to-sound latency through AudioService: the request's trip through the queue to the
+    # worker's play call. The silent backend plays instantly, so device latency is not included
+    service = AudioService({"click": ecarddemo.resource_path("click.wav")}, backend=NullBackend()).start()
+    service.ready.wait()
+    samples = []
+    while len(samples) < plays:
+        # The service keeps only its last latencies.maxlen, so collect them in batches
+        service.latencies.clear()
+        for i in range(min(plays - len(samples), service.latencies.maxlen)):
+            service.play("click")
+            while len(service.latencies) <= i:
+                time.sleep(0)
+        samples.extend(service.latencies)
+    service.close()
+    return {"audio_click_p50_us": percentile(samples, 0.5) * 1e6, "audio_click_p99_us": percentile(samples, 0.99) * 1e6}
+
+
+def bench_gui(root, args):
+    app = ecarddemo.ECardApp(root, seed=args.seed, clock=VirtualClock())
+    root.update()
+    result = {}
+
+    # Whole rounds through ECardGame: clicks, pauses, both flips, result and banner
+    driver = guidriver.GuiDriver(root, app)
+    result["gui_rounds_per_sec"] = driver.run(
+        guidriver.generate_events(app, random.Random(args.seed), args.gui_matches))["rounds_per_sec"]
+
+    # A cache miss on reveal: frames built and turned into PhotoImages
+    samples = []
+    for i in range(args.flips // 10 or 1):
+        cache = FlipFrameCache(app.pil_images)
+        start = time.perf_counter()
+        cache.get("Back", engine.CARD_NAMES[i % len(engine.CARD_NAMES)], 8, app.card_size)
+        samples.append(time.perf_counter() - start)
+    result["flip_cold_get_ms"] = statistics.median(samples) * 1000
+    app.clear_screen()
+    harness.close_app(app)
+
+    # A fresh app dealt the big hand, so its CPU and layout are built for that size
+    for widget in root.winfo_children():
+        widget.destroy()
+    app = ecarddemo.ECardApp(root, seed=args.seed, clock=VirtualClock(), hand_size=args.hand_size)
+    app.start_game("Emperor")
+    root.update()
+    result.update(bench_player_hand(app.game))
+    result.update(bench_sidebar(app.game))
+    harness.close_app(app)
+    return result
+
+
+def bench_player_hand(game):
+    # update_player_hand over the whole hand, one Citizen at a time
+    samples = []
+    while engine.counts(game.state)[0]:
+        game.state, _ = engine.play(game.state, engine.CITIZEN, engine.CITIZEN)
+        start = time.perf_counter()
+        game.update_player_hand()
+        samples.append(time.perf_counter() - start)
+    return {"update_player_hand_us": statistics.median(samples) * 1e6}
+
+
+def bench_sidebar(game, lengths=SIDEBAR_HISTORY, window=50):
+    # update_sidebar with one new row per call, timed over a window at each history length
+    result = {}
+    for length in lengths:
+        samples = []
+        while game.history_total < length:
+            game.history.append(("Citizen", "Citizen"))
+            game.history_total += 1
+            timed = game.history_total > length - window
+            start = time.perf_counter()
+            game.update_sidebar()
+            if timed:
+                samples.append(time.perf_counter() - start)
+        result[f"update_sidebar_us_at_{length}"] = statistics.median(samples) * 1e6
+    return result
+
+
+def bench_startup():
+    proc = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError((proc.stderr.strip().splitlines() or ["startup failed"])[-1])
+    times = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {"startup_first_paint_ms": times["first_paint"] * 1000}
+
+
+def run_suite(args):
+    runs = []
+    skipped = {}
+    for _ in range(args.repeat):
+        metrics = {}
+        metrics.update(bench_rules(args.rounds))
+        metrics.update(bench_cpu_move(args.moves))
+        metrics.update(bench_flip_frames(args.flips))
+        metrics.update(bench_audio(args.plays))
+        try:
+            root = tk.Tk()
+        except tk.TclError as e:
+            skipped["gui"] = f"no display: {e}"
+        else:
+            try:
+                metrics.update(bench_gui(root, args))
+            finally:
+                root.destroy()
+            try:
+                metrics.update(bench_startup())
+            except RuntimeError as e:
+                skipped["startup"] = str(e)
+        runs.append(metrics)
+    metrics = {name: statistics.median(run[name] for run in runs) for name in METRICS if name in runs[0]}
+    if "gui" in skipped:
+        skipped["startup"] = skipped["gui"]
+    return metrics, skipped
+
+
+def compare(metrics, baseline, threshold):
+    # {name: {baseline, value, change, regressed}} for metrics present in both runs;
+    # missing_metrics() lists what the baseline has and this run does not
+    rows = {}
+    for name, value in metrics.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        _, higher_is_better, tolerance = METRICS[name]
+        change = value / base - 1
+        worse = -change if higher_is_better else change
+        allowed = max(threshold, tolerance or 0)
+        rows[name] = {"baseline": base, "value": value, "change": change, "allowed": allowed,
+                      "regressed": worse > allowed}
+    return rows
+
+
+def missing_metrics(metrics, baseline):
+    return [name for name in METRICS if name in baseline and name not in metrics]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200_000, help="rounds for the rules benchmark")
+    parser.add_argument("--moves", type=int, default=100_000, help="CPU moves timed")
+    parser.add_argument("--flips", type=int, default=200, help="flips built for the frame benchmark")
+    parser.add_argument("--plays", type=int, default=5000, help="click sounds timed")
+    parser.add_argument("--hand-size", type=int, default=50, help="hand dealt for the hand and sidebar benchmarks")
+    parser.add_argument("--gui-matches", type=int, default=100, help="matches played through the GUI")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the result here")
+    parser.add_argument("--baseline", help="compare with this stored result")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown as a fraction")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="list baseline metrics this run could not measure instead of failing")
+    parser.add_argument("--save-baseline", help="also write the result here, as the new baseline "
+                        f"(--repeat is raised to at least {BASELINE_REPEAT})")
+    args = parser.parse_args(argv)
+    if args.save_baseline:
+        args.repeat = max(args.repeat, BASELINE_REPEAT)
+
+    metrics, skipped = run_suite(args)
+    result = {
+        "version": 1,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": metrics,
+        "units": {name: METRICS[name][0] for name in metrics},
+        "skipped": skipped,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["metrics"]
+        result["threshold"] = args.threshold
+        result["comparison"] = compare(metrics, baseline, args.threshold)
+        result["regressions"] = [name for name, row in result["comparison"].items() if row["regressed"]]
+        result["missing"] = missing_metrics(metrics, baseline)
+        result["not_in_baseline"] = [name for name in metrics if name not in baseline]
+        result["passed"] = not result["regressions"] and (args.allow_missing or not result["missing"])
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(result, f, indent=2)
+
+    comparison = result.get("comparison", {})
+    for name, value in metrics.items():
+        line = f"{name:<28} {value:>12.2f} {METRICS[name][0]}"
+        row = comparison.get(name)
+        if row:
+            line += f"   {row['change']:+7.1%} vs baseline{'  REGRESSION' if row['regressed'] else ''}"
+        elif args.baseline:
+            line += "   (not in baseline)"
+        print(line)
+    for name in result.get("missing", ()):
+        print(f"{name:<28} MISSING: in the baseline but not measured")
+    for name, reason in skipped.items():
+        print(f"{name:<28} skipped ({reason})")
+    if args.save_baseline and skipped:
+        print(f"warning: {args.save_baseline} lacks the skipped benchmarks; save it where they can run "
+              f"(e.g. under xvfb-run)", file=sys.stderr)
+    return 0 if result.get("passed", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""Single-Canvas renderer for the E-Card GUI.
+
+The widget renderer builds every screen out of Labels and Frames and
+destroys them all on each role change or new game. CanvasRenderer draws the
+role screen, the table, the hand, the sidebar and the banners as items on
+one tk.Canvas that lives as long as the app. Screens are switched by hiding
+and showing item tags, and a new round or game only re-configures existing
+items, so nothing is allocated after start-up.
+
+The canvas has one click and one motion binding. Hit-testing is done here
+from the known layout: hand cards by arithmetic over their row, buttons by
+their bounding boxes.
+"""
+import tkinter as tk
+
+WIDTH, HEIGHT = 1150, 890
+FELT = "#145a32"
+GOLD = "#FFD700"
+
+CARD_W, CARD_H = 120, 180
+TABLE = (20, 20, 740, 870)  # felt panel
+TABLE_X = (TABLE[0] + TABLE[2]) // 2
+HAND_Y = 650  # top of the hand row
+HAND_STEP = 136  # card plus the padding the widget layout used
+SIDEBAR_X = 770
+HISTORY_ROWS = 36  # rows that fit in the history box
+
+SCREENS = ("roles", "table")
+
+
+class CanvasItem:
+    # Just enough of the Label interface (config with image/text/fg/bg) for ECardGame's round logic
+    def __init__(self, canvas, item, box=None, pad=(20, 10)):
+        self.canvas = canvas
+        self.item = item
+        self.box = box  # background rectangle that follows the text's size
+        self.pad = pad
+        self.image = None
+
+    def config(self, image=None, text=None, fg=None, bg=None):
+        options = {}
+        if image is not None:
+            options["image"] = image
+        if text is not None:
+            options["text"] = text
+        if fg is not None:
+            options["fill"] = fg
+        if options:
+            self.canvas.itemconfigure(self.item, **options)
+        if self.box is not None:
+            if bg is not None:
+                self.canvas.itemconfigure(self.box, fill=bg)
+            self.fit_box()
+
+    configure = config
+
+    def fit_box(self):
+        text = self.canvas.itemcget(self.item, "text")
+        if not text:
+            self.canvas.itemconfigure(self.box, state="hidden")
+            return
+        x1, y1, x2, y2 = self.canvas.bbox(self.item)
+        px, py = self.pad
+        self.canvas.coords(self.box, x1 - px, y1 - py, x2 + px, y2 + py)
+        self.canvas.itemconfigure(self.box, state="")
+
+
+class CanvasRenderer:
+    def __init__(self, root, card_images, hand_size):
+        self.root = root
+        self.card_images = card_images
+        self.canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT, bg=FELT, highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.buttons = {}  # name -> (screen, bbox, rect item, normal fill, hover fill)
+        self.actions = {}  # name -> callback, set by the app and the current game
+        self.on_card = None  # callback(hand index) for clicks on the hand
+        self.hand = []  # card names currently drawn in the hand row
+        self.hover = None
+        self.screen = None
+        self.hand_items = []  # (image, highlight ring) per hand slot, reused by every game
+        self.hand_x = []  # left edge of each slot in the current layout
+        self.build_roles()
+        self.build_table()
+        self.build_hand(hand_size)
+        self.canvas.bind("<Button-1>", self.click)
+        self.canvas.bind("<Motion>", self.motion)
+        self.canvas.bind("<Leave>", lambda e: self.set_hover(None))
+        self.show(None)
+
+    # Building (once)
+
+    def button(self, screen, name, bbox, text, fill, text_fill, hover_fill, font=("Arial", 11), image=None):
+        c = self.canvas
+        tags = (screen, "button")
+        rect = c.create_rectangle(*bbox, fill=fill, outline="#555", width=2, tags=tags)
+        x1, y1, x2, y2 = bbox
+        if image is not None:
+            c.create_image((x1 + x2) // 2, y1 + 18 + CARD_H // 2, image=image, tags=tags)
+            c.create_text((x1 + x2) // 2, y2 - 22, text=text, font=font, fill=text_fill, tags=tags)
+        else:
+            c.create_text((x1 + x2) // 2, (y1 + y2) // 2, text=text, font=font, fill=text_fill, tags=tags)
+        self.buttons[name] = (screen, bbox, rect, fill, hover_fill)
+
+    def build_roles(self):
+        c = self.canvas
+        c.create_rectangle(0, 0, WIDTH, HEIGHT, fill=FELT, width=0, tags="roles")
+        c.create_text(WIDTH // 2, 100, text="Choose Your Role", font=("Arial", 28, "bold"), fill=GOLD, tags="roles")
+        c.create_rectangle(WIDTH // 2 - 160, 135, WIDTH // 2 + 160, 138, fill=GOLD, width=0, tags="roles")
+        for i, role in enumerate(("Emperor", "Slave")):
+            x = WIDTH // 2 + (i * 2 - 1) * 170
+            self.button("roles", role, (x - 96, 200, x + 96, 460), role, "#222", GOLD, "#333",
+                        font=("Arial", 16, "bold"), image=self.card_images[role])
+
+    def build_table(self):
+        c = self.canvas
+        c.create_rectangle(0, 0, WIDTH, HEIGHT, fill="#f0f0f0", width=0, tags="table")
+        c.create_rectangle(*TABLE, fill=FELT, outline="#0e3f23", width=4, tags="table")
+        self.role_text = c.create_text(TABLE_X, 45, font=("Arial", 14), fill="white", tags="table")
+        self.cpu_slot = CanvasItem(c, c.create_image(TABLE_X, 165, image=self.card_images["Back"], tags="table"))
+        c.create_text(TABLE_X, 295, text="VS", font=("Arial", 28, "bold"), fill=GOLD, tags="table")
+        self.player_slot = CanvasItem(c, c.create_image(TABLE_X, 425, image=self.card_images["Back"], tags="table"))
+        self.result_text = CanvasItem(c, c.create_text(TABLE_X, 545, font=("Arial", 12), fill="white", tags="table"))
+        box = c.create_rectangle(0, 0, 0, 0, fill="#222", width=0, tags="table")
+        self.banner = CanvasItem(c, c.create_text(TABLE_X, 590, font=("Arial", 18, "bold"), fill="#fff", tags="table"),
+                                 box)
+        c.create_rectangle(TABLE[0] + 20, HAND_Y - 12, TABLE[2] - 20, HAND_Y + CARD_H + 12,
+                           fill="#2e2e2e", width=0, tags="table")
+        self.button("again", "again", (TABLE_X - 60, 834, TABLE_X + 60, 862), "Play Again", "#4CAF50", "white",
+                    "#43a047", font=("Arial", 12, "bold"))
+
+        # Sidebar
+        x1, x2 = SIDEBAR_X, WIDTH - 10
+        self.button("table", "sound", (x1, 20, x2, 54), "🎚️ Sound Settings", "#222", GOLD, "#333",
+                    font=("Arial", 12, "bold"))
+        box = c.create_rectangle(0, 0, 0, 0, fill=GOLD, outline="#555", width=2, tags="table")
+        self.score = CanvasItem(c, c.create_text((x1 + x2) // 2, 100, font=("Arial", 18, "bold"), fill="#333",
+                                                 tags="table"), box, pad=(18, 6))
+        width = (x2 - x1 - 16) // 3
+        for i, (name, text) in enumerate((("reset", "Reset Score"), ("clear", "Clear History"),
+                                          ("change_role", "Change Role"))):
+            left = x1 + i * (width + 8)
+            self.button("table", name, (left, 140, left + width, 172), text, "#fff", "#333", GOLD)
+        c.create_text((x1 + x2) // 2, 200, text="Card Status", font=("Arial", 14, "bold"), tags="table")
+        self.remaining = CanvasItem(c, c.create_text(x1 + 10, 222, anchor="nw", font=("Arial", 11), tags="table"))
+        c.create_rectangle(x1, 275, x2, HEIGHT - 20, fill="#fff", outline="#999", width=2, tags="table")
+        c.create_text((x1 + x2) // 2, 292, text="History", font=("Arial", 12, "bold"), tags="table")
+        self.history = CanvasItem(c, c.create_text(x1 + 8, 310, anchor="nw", font=("Courier", 9), tags="table"))
+
+    def build_hand(self, count):
+        # Items are only ever added, when a game has a bigger hand than any before it
+        c = self.canvas
+        for _ in range(len(self.hand_items), count):
+            ring = c.create_rectangle(0, 0, 0, 0, outline=GOLD, width=3, state="hidden", tags="hand")
+            image = c.create_image(0, 0, anchor="nw", state="hidden", tags="hand")
+            self.hand_items.append((image, ring))
+            self.hand_x.append(0)
+
+    # Screens
+
+    def show(self, screen):
+        # Hide everything, then show one screen's items; the hand and Play Again are shown by their owners
+        self.screen = screen
+        for tag in SCREENS + ("hand", "again"):
+            self.canvas.itemconfigure(tag, state="hidden")
+        if screen:
+            self.canvas.itemconfigure(screen, state="")
+        # A button clicked while hovered never saw <Leave>
+        for _, _, rect, fill, _ in self.buttons.values():
+            self.canvas.itemconfigure(rect, fill=fill)
+        self.canvas.config(cursor="")
+        self.hand = []
+        self.hover = None
+
+    def show_again(self, shown=True):
+        self.canvas.itemconfigure("again", state="" if shown else "hidden")
+
+    def set_role_text(self, text):
+        self.canvas.itemconfigure(self.role_text, text=text)
+
+    def set_hand(self, cards):
+        # Lay the row out centred, squeezing the spacing if a big hand would overflow the table
+        c = self.canvas
+        self.build_hand(len(cards))
+        step = HAND_STEP
+        if len(cards) > 1:
+            step = min(step, (TABLE[2] - TABLE[0] - 60 - CARD_W) // (len(cards) - 1))
+        left = TABLE_X - (step * (len(cards) - 1) + CARD_W) // 2
+        for i, (image, ring) in enumerate(self.hand_items):
+            if i < len(cards):
+                x = left + i * step
+                self.hand_x[i] = x
+                c.itemconfigure(image, image=self.card_images[cards[i]], state="")
+                c.coords(image, x, HAND_Y)
+                c.coords(ring, x - 3, HAND_Y - 3, x + CARD_W + 3, HAND_Y + CARD_H + 3)
+            elif i < len(self.hand):
+                c.itemconfigure(image, state="hidden")
+            c.itemconfigure(ring, state="hidden")
+        self.hand = list(cards)
+        self.hover = None
+
+    # Hit-testing
+
+    def hit(self, x, y):
+        # ("card", index), ("button", name) or None
+        if self.hand and HAND_Y <= y < HAND_Y + CARD_H:
+            # Later cards are drawn on top when the row is squeezed, so search from the right
+            for i in range(len(self.hand) - 1, -1, -1):
+                if self.hand_x[i] <= x < self.hand_x[i] + CARD_W:
+                    return "card", i
+        for name, (screen, (x1, y1, x2, y2), _, _, _) in self.buttons.items():
+            if x1 <= x < x2 and y1 <= y < y2 and self.visible(screen):
+                return "button", name
+        return None
+
+    def visible(self, screen):
+        if screen == "again":
+            return self.canvas.itemcget(self.buttons["again"][2], "state") != "hidden"
+        return screen == self.screen
+
+    def click(self, event):
+        target = self.hit(event.x, event.y)
+        if target is None:
+            return
+        kind, key = target
+        if kind == "card":
+            if self.on_card:
+                self.on_card(key)
+        elif key in self.actions:
+            self.actions[key]()
+
+    def motion(self, event):
+        self.set_hover(self.hit(event.x, event.y))
+
+    def set_hover(self, target):
+        if target == self.hover:
+            return
+        for item, on in ((self.hover, False), (target, True)):
+            if item is None:
+                continue
+            kind, key = item
+            if kind == "card":
+                if key < len(self.hand):
+                    self.canvas.itemconfigure(self.hand_items[key][1], state="" if on else "hidden")
+            else:
+                _, _, rect, fill, hover_fill = self.buttons[key]
+                self.canvas.itemconfigure(rect, fill=hover_fill if on else fill)
+        self.hover = target
+        self.canvas.config(cursor="hand2" if target else "")
+
+    def item_count(self):
+        return len(self.canvas.find_all())
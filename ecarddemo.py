@@ -1,18 +1,35 @@
+import time
+_PROCESS_START = time.perf_counter()
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
-import random
-import winsound
-import pygame
+from PIL import Image
 import sys
 import os
+import json
+import random
+from collections import deque
+import assets
+import engine
+import instrument
+import matchlog
+import mipcache
+import solver
+import kaijisolver
+import opponent
+from flipcache import FlipFrameCache
+from scheduler import FrameScheduler
+from audio import AudioService
+from canvasview import CanvasRenderer, HISTORY_ROWS
+# pygame is imported on the audio worker thread (see audio.PygameBackend)
+_IMPORTS_DONE = time.perf_counter()
 
 # Helper for PyInstaller compatibility
 def resource_path(relative_path):
     base_path = getattr(sys, '_MEIPASS', None)
     if base_path:
         return os.path.join(base_path, relative_path)
-    return os.path.join(os.path.abspath('.'), relative_path)
+    # Next to this file, not the working directory, so the game runs from anywhere
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), relative_path)
 
 # Paths to card images
 card_paths = {
@@ -22,20 +39,74 @@ card_paths = {
     "Back": resource_path("back.jpg")
 }
 
+# Cards drawn on the role selection screen; the rest decode in the background
+FIRST_PAINT_CARDS = ("Emperor", "Slave")
+
+# Set ECARD_STARTUP_REPORT=1 to print per-phase startup times (ms) as JSON on stderr.
+# first_paint is measured from process start, i.e. time-to-interactive; the rest are durations.
+STARTUP_PHASES = ("imports", "image_decode", "first_paint", "mixer_init", "sound_decode")
+
+# Window size (roughly) the game screen needs with 120x180 cards; bigger windows scale the cards up
+LAYOUT_SIZE = (1050, 880)
+MAX_CARD_SCALE = 3.0
+
+# Rounds kept in the sidebar history before the oldest ones are dropped
+HISTORY_LIMIT = 500
+
+# Hot paths timed when ECARD_PROFILE=trace.json is set (see instrument.py)
+PROFILED_GAME = ("play_round", "reveal_cards", "update_player_hand", "update_sidebar",
+                 "flip_card_animation", "show_result", "play_sound")
+PROFILED_APP = ("clear_screen", "show_role_selection", "start_game", "play_click_sound")
+
+
+class LazyImageDict(dict):
+    # Builds missing entries on first access with loader(name)
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+
+    def __missing__(self, name):
+        value = self[name] = self.loader(name)
+        return value
+
 
 class ECardApp:
-    def __init__(self, root):
+    def __init__(self, root, renderer=None, seed=None, clock=None, hand_size=engine.HAND_SIZE):
+        # renderer: "widgets" (default) or "canvas"; None reads ECARD_RENDERER.
+        # seed fixes the CPU's card choices; clock (scheduler.VirtualClock) runs all pacing instantly;
+        # hand_size is the number of cards dealt to each side
         self.root = root
+        self.rng = random.Random(seed)
         self.root.title("E-Card Game - Kaiji Style")
-        # Store both PIL and Tk images for animation
-        self.pil_images = {name: Image.open(resource_path(path)).resize((120, 180)) for name, path in card_paths.items()}
-        self.card_images = {name: ImageTk.PhotoImage(self.pil_images[name]) for name in card_paths}
+        self.startup_times = {"imports": _IMPORTS_DONE - _PROCESS_START}
+        self.startup_reported = False
+        # Pre-decoded images and PCM come from the mapped bundle when there is one
+        self.bundle = assets.open_bundle(resource_path(assets.BUNDLE_NAME))
+        # Store both PIL and Tk images for animation; only the role screen cards are decoded up front.
+        # card_images[name] is the card at the current card size; other sizes are resampled in the background
+        start = time.perf_counter()
+        self.pil_images = LazyImageDict(self.load_card_image)
+        self.card_images = mipcache.MipImageCache(self.root, self.pil_images, self.load_source_image,
+                                                  on_ready=self.refresh_card_images)
+        for name in FIRST_PAINT_CARDS:
+            self.card_images[name]  # Force the decode now
+        self.mark_startup("image_decode", start)
+        self.role_buttons = {}
+        self._resize_after = None
+        # Flip frames for every reveal are resized in the background once
+        self.flip_cache = FlipFrameCache(self.pil_images, bundle=self.bundle, scale=self.card_images.pil)
+        # Single tick for every animation, delay and banner timeout
+        self.scheduler = FrameScheduler(self.root, clock=clock)
+        self.warm_flips(mipcache.BASE_SIZE)
         self.player_score = 0
         self.cpu_score = 0
+        self.hand_size = hand_size
+        self.history_limit = HISTORY_LIMIT
+        self.load_cpu()
+        # Every round and match outcome is appended here (None if the log dir is not writable)
+        self.match_log = matchlog.open_default_log()
         self.theme_muted = False
         self.theme_playing = False
-        pygame.mixer.init()
-        pygame.mixer.set_num_channels(8)
         self.sounds = {
             'theme': resource_path('theme.wav'),
             'flip': resource_path('flip.wav'),
@@ -44,42 +115,104 @@ class ECardApp:
             'draw': resource_path('draw.wav'),
             'click': resource_path('click.wav'),
         }
-        self.sound_effects = {}
         self.theme_volume = 0.5
         self.effects_volume = 1.0
-        for k, v in self.sounds.items():
-            if k != 'theme':
-                try:
-                    s = pygame.mixer.Sound(v)
-                    s.set_volume(self.effects_volume)
-                    self.sound_effects[k] = s
-                except Exception:
-                    pass
+        self.sound_panel = None  # One Toplevel for the session, hidden rather than destroyed
+        self.game = None
+        # Mixer start-up and sound decoding happen on the audio worker, never before the first frame
+        effects = {k: v for k, v in self.sounds.items() if k != 'theme'}
+        self.audio = AudioService(effects, bundle=self.bundle, effects_volume=self.effects_volume,
+                                  on_phase=self.mark_startup).start()
         self.play_theme_sound()
+        self.renderer = None
+        if (renderer or os.environ.get("ECARD_RENDERER")) == "canvas":
+            # One persistent canvas for every screen instead of rebuilding widget trees
+            self.renderer = CanvasRenderer(self.root, self.card_images, self.hand_size)
+            for role in engine.ROLES:
+                self.renderer.actions[role] = lambda r=role: (
+                    self.play_click_sound(), self.start_game(r, self.player_score, self.cpu_score))
+        else:
+            # Cards follow the window size (the canvas layout is fixed-size)
+            self.root.bind("<Configure>", self.on_resize)
+            self.root.after_idle(lambda: self.card_images.prefetch(card_paths))
         self.show_role_selection()
+        self.root.after_idle(lambda: self.mark_startup("first_paint", _PROCESS_START))
+
+    def load_cpu(self):
+        # Everything sized by the hand; start_game reloads it if hand_size has changed since.
+        # Solved CPU strategy; falls back to solving in place if the table is missing
+        self.cpu_strategy = solver.StrategyTable.load(resource_path(solver.DEFAULT_TABLE), self.hand_size)
+        # Solved Kaiji match wagers per starting role, for the suggested wager of every bout
+        self.kaiji_tables = {role: kaijisolver.WagerTable.load(resource_path(kaijisolver.DEFAULT_TABLE),
+                                                               first_role=role, hand_size=self.hand_size)
+                             for role in engine.ROLES}
+        # Adaptive CPU: learns this player's habits on top of the solved strategy, kept between sessions
+        self.cpu_policy_path = os.path.join(matchlog.default_log_dir(), opponent.model_name(self.hand_size))
+        self.cpu_policy = opponent.OpponentModel.load(self.cpu_policy_path, self.hand_size, self.cpu_strategy)
+
+    def load_card_image(self, name):
+        img = self.bundle.image(name) if self.bundle else None
+        if img is None:
+            img = Image.open(card_paths[name]).resize(mipcache.BASE_SIZE)
+        return img
+
+    def load_source_image(self, name):
+        # Full-resolution art for the other sizes (runs on the resampling threads)
+        return Image.open(card_paths[name])
+
+    @property
+    def card_size(self):
+        return self.card_images.active
+
+    def warm_flips(self, size):
+        self.flip_cache.warm([("Back", name, 8, size) for name in ("Emperor", "Citizen", "Slave")])
+
+    def on_resize(self, event):
+        if event.widget is not self.root:
+            return
+        # A window drag sends a stream of these; only act once it settles
+        if self._resize_after is not None:
+            self.root.after_cancel(self._resize_after)
+        self._resize_after = self.root.after(80, lambda: self.apply_window_size(event.width, event.height))
+
+    def apply_window_size(self, width, height):
+        self._resize_after = None
+        # Never below the base size: the window shrinks around its content, which would feed back
+        scale = min(width / LAYOUT_SIZE[0], height / LAYOUT_SIZE[1])
+        size = mipcache.scaled_size(min(max(scale, 1.0), MAX_CARD_SCALE))
+        if size == self.card_size:
+            return
+        self.card_images.set_active(size)
+        self.flip_cache.retain(size)  # Flips at the old size would otherwise pile up with every resize
+        self.warm_flips(size)
+        self.refresh_card_images()
+
+    def refresh_card_images(self):
+        # Point every card on screen at the current size (exact if ready, else the nearest one)
+        for role, label in self.role_buttons.items():
+            label.config(image=self.card_images[role])
+        if self.game is not None:
+            self.game.refresh_card_images()
+
+    def mark_startup(self, phase, start):
+        self.startup_times[phase] = time.perf_counter() - start
+        if (not self.startup_reported and os.environ.get("ECARD_STARTUP_REPORT")
+                and all(p in self.startup_times for p in STARTUP_PHASES)):
+            self.startup_reported = True
+            print(json.dumps({p: round(self.startup_times[p] * 1000, 2) for p in STARTUP_PHASES}),
+                  file=sys.stderr)
 
     def play_click_sound(self):
-        try:
-            self.sound_effects['click'].play()
-        except Exception as e:
-            pass
+        self.audio.play('click')
 
     def play_theme_sound(self):
         if not self.theme_muted:
-            try:
-                pygame.mixer.music.load(self.sounds['theme'])
-                pygame.mixer.music.set_volume(self.theme_volume)
-                pygame.mixer.music.play(-1)
-                self.theme_playing = True
-            except Exception:
-                pass
+            self.audio.play_music(self.sounds['theme'], self.theme_volume)
+            self.theme_playing = True
 
     def stop_theme_sound(self):
-        try:
-            pygame.mixer.music.stop()
-            self.theme_playing = False
-        except Exception:
-            pass
+        self.audio.stop_music()
+        self.theme_playing = False
 
     def toggle_theme_sound(self):
         self.theme_muted = not self.theme_muted
@@ -90,6 +223,9 @@ class ECardApp:
 
     def show_role_selection(self):
         self.clear_screen()
+        if self.renderer:
+            self.renderer.show("roles")
+            return
         # Modern background frame
         bg_frame = tk.Frame(self.root, bg="#145a32")
         bg_frame.pack(fill="both", expand=True)
@@ -110,6 +246,7 @@ class ECardApp:
                               font=("Arial", 16, "bold"), fg="#FFD700", bg="#222", bd=6, relief="ridge",
                               padx=24, pady=18, cursor="hand2", highlightthickness=0)
         emperor_btn.grid(row=0, column=0, padx=40)
+        self.role_buttons["Emperor"] = emperor_btn
         emperor_btn.bind("<Enter>", lambda e: emperor_btn.config(bg="#333"))
         emperor_btn.bind("<Leave>", lambda e: emperor_btn.config(bg="#222"))
         emperor_btn.bind("<Button-1>", lambda e: (self.play_click_sound(), self.start_game("Emperor", self.player_score, self.cpu_score)))
@@ -120,17 +257,79 @@ class ECardApp:
                             font=("Arial", 16, "bold"), fg="#FFD700", bg="#222", bd=6, relief="ridge",
                             padx=24, pady=18, cursor="hand2", highlightthickness=0)
         slave_btn.grid(row=0, column=1, padx=40)
+        self.role_buttons["Slave"] = slave_btn
         slave_btn.bind("<Enter>", lambda e: slave_btn.config(bg="#333"))
         slave_btn.bind("<Leave>", lambda e: slave_btn.config(bg="#222"))
         slave_btn.bind("<Button-1>", lambda e: (self.play_click_sound(), self.start_game("Slave", self.player_score, self.cpu_score)))
 
+        # Kaiji match: twelve bouts with wagers, starting as the Emperor
+        kaiji_btn = tk.Button(bg_frame, text=f"Kaiji Match · {engine.KAIJI_BOUTS} bouts with wagers",
+                              font=("Arial", 14, "bold"), fg="#222", bg="#FFD700", activebackground="#FFC300",
+                              bd=3, relief="ridge", cursor="hand2",
+                              command=lambda: (self.play_click_sound(), self.start_kaiji("Emperor")))
+        kaiji_btn.pack(pady=(30, 0))
+
+    def open_sound_panel(self):
+        if self.sound_panel is not None:
+            self.sound_panel.deiconify()
+            self.sound_panel.lift()
+            return
+        panel = self.sound_panel = tk.Toplevel(self.root)
+        panel.title("Sound Settings")
+        panel.geometry("320x180")
+        panel.resizable(False, False)
+        panel.protocol("WM_DELETE_WINDOW", panel.withdraw)
+        tk.Label(panel, text="Theme Volume", font=("Arial", 12, "bold")).pack(pady=(18, 2))
+        theme_slider = tk.Scale(panel, from_=0, to=100, orient="horizontal", resolution=1, length=220)
+        theme_slider.set(int(self.theme_volume * 100))
+        theme_slider.pack()
+        tk.Label(panel, text="Effects Volume", font=("Arial", 12, "bold")).pack(pady=(18, 2))
+        effects_slider = tk.Scale(panel, from_=0, to=100, orient="horizontal", resolution=1, length=220)
+        effects_slider.set(int(self.effects_volume * 100))
+        effects_slider.pack()
+
+        def update_theme_volume(val):
+            v = int(val) / 100
+            self.theme_volume = v
+            self.audio.set_music_volume(v)
+
+        def update_effects_volume(val):
+            v = int(val) / 100
+            self.effects_volume = v
+            self.audio.set_effects_volume(v)
+
+        theme_slider.config(command=update_theme_volume)
+        effects_slider.config(command=update_effects_volume)
+
     def start_game(self, role, player_score=0, cpu_score=0):
         self.clear_screen()
-        self.game = ECardGame(self.root, self, role, self.card_images, player_score, cpu_score)
+        if self.cpu_policy.hand_size != self.hand_size:
+            self.load_cpu()
+        game_class = CanvasGame if self.renderer else ECardGame
+        self.game = game_class(self.root, self, role, self.card_images, player_score, cpu_score)
+
+    def start_kaiji(self, first_role="Emperor", match=None):
+        # One KaijiGame per bout; match carries (bouts played, stake left, winnings) to the next one.
+        # Widget renderer only: the canvas role screen has no Kaiji button
+        self.clear_screen()
+        if self.cpu_policy.hand_size != self.hand_size:
+            self.load_cpu()
+        self.game = KaijiGame(self.root, self, first_role, match or engine.new_kaiji_match(),
+                              self.player_score, self.cpu_score)
 
     def clear_screen(self):
+        # Pending flips and timers belong to widgets about to be destroyed
+        self.scheduler.cancel_all()
+        if self.game is not None:
+            self.game.teardown()
+            self.game = None
+        self.role_buttons = {}
+        if self.renderer:
+            self.renderer.show(None)  # Canvas items are hidden and reused, never destroyed
+            return
         for widget in self.root.winfo_children():
-            widget.destroy()
+            if widget is not self.sound_panel:
+                widget.destroy()
 
 
 class ECardGame:
@@ -142,21 +341,32 @@ class ECardGame:
         self.card_images = card_images
         self.pil_images = app.pil_images  # Access PIL images for animation
 
-        self.player_hand = self.init_hand(self.role)
-        self.cpu_hand = self.init_hand(self.cpu_role)
+        # All rules state lives in the engine; the hands below are views of it
+        self.state = engine.new_match(self.role, app.hand_size)
+        self.outcome = engine.DRAW
 
         self.chosen_player_card = None
         self.chosen_cpu_card = None
-        self.history = []
+        # Ring buffer of (player_card, cpu_card); history_total counts every round recorded
+        self.history = deque(maxlen=app.history_limit)
+        self.history_total = 0
+        self.history_rendered = 0
+        self.history_lines = 0
         self.player_score = player_score
         self.cpu_score = cpu_score
         self.game_over = False
+        # Set from the click that plays a card until its result is shown; clicks in between are ignored
+        self.round_in_flight = False
+        if app.match_log:
+            app.match_log.start_match(self.role, app.hand_size)
+        self.build_ui()
 
+    def build_ui(self):
         # Main layout frames
-        self.main_frame = tk.Frame(root, bg="#145a32", bd=4, relief="ridge")  # Green felt background
+        self.main_frame = tk.Frame(self.root, bg="#145a32", bd=4, relief="ridge")  # Green felt background
         self.main_frame.pack(side="left", padx=20, pady=20, ipadx=10, ipady=10)
 
-        self.sidebar = tk.Frame(root)
+        self.sidebar = tk.Frame(self.root)
         self.sidebar.pack(side="right", padx=10, fill="y")
 
         self.label = tk.Label(self.main_frame, text=f"You are playing as: {self.role}", font=("Arial", 14), bg="#145a32", fg="white")
@@ -169,6 +379,7 @@ class ECardGame:
         # CPU played card (top center)
         self.cpu_card_slot = tk.Label(self.table_frame, image=self.card_images["Back"], bg="#145a32", bd=3, relief="groove")
         self.cpu_card_slot.grid(row=0, column=1, padx=30, pady=(0, 10))
+        self.cpu_card_slot.card_name = "Back"
 
         # VS label (large, prominent)
         self.vs_label = tk.Label(self.table_frame, text="VS", font=("Arial", 28, "bold"), bg="#145a32", fg="#FFD700")
@@ -177,6 +388,7 @@ class ECardGame:
         # Player played card (bottom center)
         self.player_card_slot = tk.Label(self.table_frame, image=self.card_images["Back"], bg="#145a32", bd=3, relief="groove")
         self.player_card_slot.grid(row=2, column=1, padx=30, pady=(10, 0))
+        self.player_card_slot.card_name = "Back"
 
         self.result_label = tk.Label(self.main_frame, text="", font=("Arial", 12), bg="#145a32", fg="white")
         self.result_label.pack(pady=10)
@@ -190,11 +402,16 @@ class ECardGame:
         self.create_player_hand()  # New method for hand layout
         self.create_sidebar()
 
+    @property
+    def player_hand(self):
+        return engine.player_hand(self.state)
+
+    @property
+    def cpu_hand(self):
+        return engine.cpu_hand(self.state)
+
     def init_hand(self, role):
-        if role == "Emperor":
-            return ["Emperor"] + ["Citizen"] * 4
-        else:
-            return ["Slave"] + ["Citizen"] * 4
+        return engine.init_hand(role, self.app.hand_size)
 
     def create_player_hand(self):
         # Remove old button_frame if it exists
@@ -203,6 +420,9 @@ class ECardGame:
         self.hand_frame = tk.Frame(self.main_frame, bg="#2e2e2e")
         self.hand_frame.pack(pady=20)
         self.card_labels = []
+        # Labels currently on screen / hidden by update_player_hand, per card name
+        self.shown_labels = {name: [] for name in engine.CARD_NAMES}
+        self.hidden_labels = {name: [] for name in engine.CARD_NAMES}
         # Arrange cards in a row, allow duplicates
         for idx, card_name in enumerate(self.player_hand):
             lbl = tk.Label(
@@ -223,29 +443,26 @@ class ECardGame:
             # Click to play
             lbl.bind("<Button-1>", lambda e, c=card_name: self.play_round(c))
             self.card_labels.append(lbl)
+            self.shown_labels[card_name].append(lbl)
 
     def update_player_hand(self):
-        # Refresh the hand display after a card is played
-        for lbl in self.card_labels:
-            lbl.destroy()
-        self.card_labels = []
-        for idx, card_name in enumerate(self.player_hand):
-            lbl = tk.Label(
-                self.hand_frame,
-                image=self.card_images[card_name],
-                bd=4,
-                relief="flat",
-                bg="#2e2e2e",
-                highlightthickness=2,
-                highlightbackground="#2e2e2e",
-                highlightcolor="#2e2e2e"
-            )
-            lbl.grid(row=0, column=idx, padx=8)
-            setattr(lbl, 'card_name', card_name)
-            lbl.bind("<Enter>", lambda e, l=lbl: l.config(relief="solid", highlightbackground="#FFD700", highlightcolor="#FFD700", bg="#393e46"))
-            lbl.bind("<Leave>", lambda e, l=lbl: l.config(relief="flat", highlightbackground="#2e2e2e", highlightcolor="#2e2e2e", bg="#2e2e2e"))
-            lbl.bind("<Button-1>", lambda e, c=card_name: self.play_round(c))
-            self.card_labels.append(lbl)
+        # Refresh the hand display after a card is played: hide labels for cards
+        # that left the hand (and re-show hidden ones if it grew) instead of rebuilding the row
+        citizens, special, _, _ = engine.counts(self.state)
+        wanted = {"Citizen": citizens, engine.CARD_NAMES[engine.special_card(self.role)]: int(special)}
+        for card_name, count in wanted.items():
+            shown = self.shown_labels[card_name]
+            hidden = self.hidden_labels[card_name]
+            while len(shown) > count:
+                lbl = shown.pop()
+                lbl.grid_remove()
+                # It may vanish under the pointer, so <Leave> never fires
+                lbl.config(relief="flat", highlightbackground="#2e2e2e", highlightcolor="#2e2e2e", bg="#2e2e2e")
+                hidden.append(lbl)
+            while len(shown) < count and hidden:
+                lbl = hidden.pop()
+                lbl.grid()
+                shown.append(lbl)
 
     def create_sidebar(self):
         # (Mute button removed; use sound panel instead)
@@ -313,10 +530,18 @@ class ECardGame:
         self.update_sidebar()
 
     def clear_history(self):
-        self.history = []
+        self.history.clear()
+        self.history_total = 0
+        self.history_rendered = 0
+        self.history_lines = 0
+        self.history_text.config(state="normal")
+        self.history_text.delete(1.0, "end")
+        self.history_text.config(state="disabled")
         self.update_sidebar()
 
     def change_role(self):
+        if self.app.match_log and not engine.is_over(self.state):
+            self.app.match_log.end_match(engine.DRAW, abandoned=True)
         self.app.show_role_selection()
 
     def get_score_text(self):
@@ -326,68 +551,74 @@ class ECardGame:
         # Update scoreboard
         self.score_label.config(text=self.get_score_text())
         # Update remaining
-        self.remaining_label.config(text=f"Player cards: {len(self.player_hand)}\nCPU cards: {len(self.cpu_hand)}")
-        # Update history
-        self.history_text.config(state="normal")
-        self.history_text.delete(1.0, "end")
-        for i, (p, c) in enumerate(self.history, 1):
-            self.history_text.insert("end", f"Round {i}: You → {p:<8} | CPU → {c:<8}\n")
-        self.history_text.config(state="disabled")
+        p_cit, p_special, c_cit, c_special = engine.counts(self.state)
+        self.remaining_label.config(text=f"Player cards: {p_cit + p_special}\nCPU cards: {c_cit + c_special}")
+        # Update history: append only rows not shown yet, then trim to the ring buffer size
+        new_rows = min(self.history_total - self.history_rendered, len(self.history))
+        if new_rows:
+            self.history_text.config(state="normal")
+            first = self.history_total - new_rows + 1
+            for i in range(new_rows):
+                p, c = self.history[i - new_rows]
+                self.history_text.insert("end", f"Round {first + i}: You → {p:<8} | CPU → {c:<8}\n")
+            self.history_lines += new_rows
+            overflow = self.history_lines - len(self.history)
+            if overflow > 0:
+                self.history_text.delete(1.0, f"{overflow + 1}.0")
+                self.history_lines -= overflow
+            self.history_text.config(state="disabled")
+            self.history_rendered = self.history_total
 
     def play_sound(self, key):
-        try:
-            self.app.sound_effects[key].play()
-        except Exception as e:
-            pass
+        self.app.audio.play(key)
 
     def play_round(self, player_choice):
-        if self.game_over:
+        # The hand stays clickable while a round is revealed, and after the deciding round
+        # until its result is shown; the engine state is already over by then
+        if self.game_over or self.round_in_flight or engine.is_over(self.state):
             return
         if player_choice not in self.player_hand:
             messagebox.showinfo("Error", "Card already used!")
             return
-        self.player_hand.remove(player_choice)
+        self.round_in_flight = True
         self.chosen_player_card = player_choice
-        self.chosen_cpu_card = random.choice(self.cpu_hand)
-        self.cpu_hand.remove(self.chosen_cpu_card)
-        self.player_card_slot.config(image=self.card_images["Back"])
-        self.cpu_card_slot.config(image=self.card_images["Back"])
+        self.round_state = self.state  # What the CPU model learns from once the cards are revealed
+        cpu_code = self.app.cpu_policy.cpu_card(self.state, self.app.rng)
+        self.chosen_cpu_card = engine.CARD_NAMES[cpu_code]
+        self.state, self.outcome = engine.step(self.state, engine.CARD_CODES[player_choice], cpu_code)
+        self.show_card(self.player_card_slot, "Back")
+        self.show_card(self.cpu_card_slot, "Back")
         self.result_label.config(text="Cards placed... flipping!")
         self.update_player_hand()  # Refresh hand after play
         self.play_sound('flip')
-        self.root.after(1000, self.reveal_cards)
+        self.app.scheduler.call_later(1000, self.reveal_cards)
 
     def flip_card_animation(self, slot_label, from_card, to_card, callback=None, steps=8, delay=30):
         # Animate a card flip from 'from_card' to 'to_card' on the given slot_label
-        # Shrink, swap, expand
-        pil_from = self.pil_images[from_card]
-        pil_to = self.pil_images[to_card]
-        w, h = pil_from.size
-        images = []
-        # Shrink phase
-        for i in range(steps):
-            scale = 1 - (i / steps)
-            new_w = max(1, int(w * scale))
-            img = pil_from.resize((new_w, h))
-            images.append(ImageTk.PhotoImage(img))
-        # Expand phase (after swap)
-        for i in range(steps):
-            scale = (i + 1) / steps
-            new_w = max(1, int(w * scale))
-            img = pil_to.resize((new_w, h))
-            images.append(ImageTk.PhotoImage(img))
-        def animate(idx=0):
-            if idx < len(images):
-                slot_label.config(image=images[idx])
-                slot_label.image = images[idx]  # Prevent garbage collection
-                self.root.after(delay, lambda: animate(idx + 1))
-            else:
-                slot_label.config(image=self.card_images[to_card])
-                slot_label.image = self.card_images[to_card]
-                self.play_sound('flip')
-                if callback:
-                    callback()
-        animate()
+        # Shrink, swap, expand (frames come pre-built from the app's cache)
+        images = self.app.flip_cache.get(from_card, to_card, steps, self.app.card_size)
+        def show_frame(idx):
+            slot_label.config(image=images[idx])
+            slot_label.image = images[idx]  # Prevent garbage collection
+        def done():
+            self.show_card(slot_label, to_card)
+            self.play_sound('flip')
+            if callback:
+                callback()
+        return self.app.scheduler.animate(len(images), show_frame, delay, done)
+
+    def show_card(self, slot_label, card_name):
+        slot_label.config(image=self.card_images[card_name])
+        slot_label.image = self.card_images[card_name]  # Prevent garbage collection
+        slot_label.card_name = card_name
+
+    def refresh_card_images(self):
+        # After a resize, or when exact-size images arrive: the slots and every hand label
+        for slot_label in (self.player_card_slot, self.cpu_card_slot):
+            self.show_card(slot_label, slot_label.card_name)
+        for labels in list(self.shown_labels.values()) + list(self.hidden_labels.values()):
+            for lbl in labels:
+                lbl.config(image=self.card_images[lbl.card_name])
 
     def reveal_cards(self):
         # Animate both flips, then update result and sidebar
@@ -396,21 +627,35 @@ class ECardGame:
                 text=f"You played: {self.chosen_player_card} | CPU played: {self.chosen_cpu_card}"
             )
             self.history.append((self.chosen_player_card, self.chosen_cpu_card))
+            self.history_total += 1
+            self.record_round()
+            self.app.cpu_policy.observe(self.round_state, engine.CARD_CODES[self.chosen_player_card])
+            if engine.is_over(self.state):
+                self.app.cpu_policy.save(self.app.cpu_policy_path)
             self.update_sidebar()
-            winner = self.determine_winner(self.chosen_player_card, self.chosen_cpu_card)
-            self.root.after(1000, lambda: self.show_result(winner))
-        # Animate player, then CPU, then call after_both
-        def flip_cpu():
-            self.flip_card_animation(
-                self.cpu_card_slot, "Back", self.chosen_cpu_card, after_both
-            )
-        self.flip_card_animation(
-            self.player_card_slot, "Back", self.chosen_player_card, flip_cpu
-        )
+            winner = engine.OUTCOME_NAMES[self.outcome]
+            self.app.scheduler.call_later(1000, lambda: self.show_result(winner))
+        # Both cards flip at the same time; after_both runs when the second one lands
+        pending = [2]
+        def one_done():
+            pending[0] -= 1
+            if not pending[0]:
+                after_both()
+        self.flip_card_animation(self.player_card_slot, "Back", self.chosen_player_card, one_done)
+        self.flip_card_animation(self.cpu_card_slot, "Back", self.chosen_cpu_card, one_done)
+
+    def record_round(self):
+        log = self.app.match_log
+        if log:
+            log.log_round(engine.CARD_CODES[self.chosen_player_card], engine.CARD_CODES[self.chosen_cpu_card],
+                          self.outcome)
+            if engine.is_over(self.state):
+                log.end_match(self.outcome)
 
     def show_result(self, winner):
         # Modern, minimal result banner instead of popup
         self.game_over = False
+        self.round_in_flight = False
         if winner == "Player":
             self.player_score += 1
             self.app.player_score = self.player_score
@@ -429,7 +674,7 @@ class ECardGame:
             self.game_over = True
         else:
             self.update_sidebar()
-            if not self.player_hand or not self.cpu_hand:
+            if engine.is_over(self.state):
                 self.show_result_banner("🃏 All cards used. It's a draw.", "#888")
                 self.play_sound('draw')
                 self.show_new_game_button()
@@ -439,21 +684,7 @@ class ECardGame:
                 self.play_sound('draw')
 
     def determine_winner(self, card1, card2):
-        rules = {
-            ("Emperor", "Citizen"): "Emperor",
-            ("Citizen", "Slave"): "Citizen",
-            ("Slave", "Emperor"): "Slave"
-        }
-
-        if card1 == card2:
-            return "Draw"
-
-        if (card1, card2) in rules:
-            return "Player" if rules[(card1, card2)] == card1 else "CPU"
-        elif (card2, card1) in rules:
-            return "Player" if rules[(card2, card1)] == card1 else "CPU"
-        else:
-            return "Draw"
+        return engine.OUTCOME_NAMES[engine.resolve(engine.CARD_CODES[card1], engine.CARD_CODES[card2])]
 
     def show_new_game_button(self):
         btn = tk.Button(self.main_frame, text="Play Again", font=("Arial", 12, "bold"), bg="#4CAF50", fg="white",
@@ -467,38 +698,182 @@ class ECardGame:
 
     def show_result_banner(self, text, color):
         self.result_banner.config(text=text, fg=color, bg="#222")
-        self.result_banner.after(2500, lambda: self.result_banner.config(text=""))
+        self.app.scheduler.call_later(2500, lambda: self.result_banner.config(text=""))
 
     def open_sound_panel(self):
-        panel = tk.Toplevel(self.root)
-        panel.title("Sound Settings")
-        panel.geometry("320x180")
-        panel.resizable(False, False)
-        tk.Label(panel, text="Theme Volume", font=("Arial", 12, "bold")).pack(pady=(18, 2))
-        theme_slider = tk.Scale(panel, from_=0, to=100, orient="horizontal", resolution=1, length=220)
-        theme_slider.set(int(self.app.theme_volume * 100))
-        theme_slider.pack()
-        tk.Label(panel, text="Effects Volume", font=("Arial", 12, "bold")).pack(pady=(18, 2))
-        effects_slider = tk.Scale(panel, from_=0, to=100, orient="horizontal", resolution=1, length=220)
-        effects_slider.set(int(self.app.effects_volume * 100))
-        effects_slider.pack()
+        self.app.open_sound_panel()
 
-        def update_theme_volume(val):
-            v = int(val) / 100
-            self.app.theme_volume = v
-            pygame.mixer.music.set_volume(v)
+    def teardown(self):
+        # Called by clear_screen: drop what ties this game to the screen so it is freed at once,
+        # and turn any click that is still in flight into a no-op
+        self.game_over = True
+        self.card_labels = []
+        self.shown_labels = {}
+        self.hidden_labels = {}
+
+
+class KaijiGame(ECardGame):
+    # One bout of a Kaiji match (engine.KAIJI_*): ECardGame's rules plus a wager, fixed when the
+    # first card is played and prefilled with the solved best wager (kaijisolver.py)
+
+    def __init__(self, root, app, first_role, match, player_score=0, cpu_score=0):
+        self.first_role = first_role
+        self.match = match
+        self.wagers = app.kaiji_tables[first_role]
+        self.wager = None
+        super().__init__(root, app, engine.kaiji_role(match[0], first_role), app.card_images,
+                         player_score, cpu_score)
+
+    def build_ui(self):
+        super().build_ui()
+        bout, stake, _ = self.match
+        self.label.config(text=f"Kaiji match, bout {bout + 1} of {engine.KAIJI_BOUTS}: you are the {self.role}")
+        wager_frame = tk.Frame(self.main_frame, bg="#145a32")
+        wager_frame.pack(pady=(0, 10))
+        self.kaiji_label = tk.Label(wager_frame, text=self.get_match_text(), font=("Arial", 12, "bold"),
+                                    bg="#145a32", fg="#FFD700")
+        self.kaiji_label.pack(side="left", padx=(0, 16))
+        tk.Label(wager_frame, text="Wager (mm):", font=("Arial", 12), bg="#145a32", fg="white").pack(side="left")
+        suggested = self.wagers.wager(self.match)
+        self.wager_box = tk.Spinbox(wager_frame, from_=1, to=stake, width=4, font=("Arial", 12))
+        self.wager_box.delete(0, "end")
+        self.wager_box.insert(0, suggested)
+        self.wager_box.pack(side="left", padx=6)
+        tk.Label(wager_frame, text=f"best: {suggested}, pays x{engine.KAIJI_PAYOUT[self.role]}",
+                 font=("Arial", 11), bg="#145a32", fg="white").pack(side="left")
+
+    def get_match_text(self):
+        _, stake, winnings = self.match
+        return f"Stake left: {stake} mm   Winnings: ¥{winnings}M"
+
+    def read_wager(self):
+        # Whatever was typed, clamped to the stake; the suggestion if it is not a number
+        try:
+            wager = int(self.wager_box.get())
+        except ValueError:
+            wager = self.wagers.wager(self.match)
+        return min(max(wager, 1), self.match[1])
 
-        def update_effects_volume(val):
-            v = int(val) / 100
-            self.app.effects_volume = v
-            for s in self.app.sound_effects.values():
-                s.set_volume(v)
+    def play_round(self, player_choice):
+        if (self.wager is None and not self.game_over and not self.round_in_flight
+                and player_choice in self.player_hand):
+            self.wager = self.read_wager()
+            self.wager_box.config(state="disabled")
+        super().play_round(player_choice)
 
-        theme_slider.config(command=update_theme_volume)
-        effects_slider.config(command=update_effects_volume)
+    def show_result(self, winner):
+        if engine.is_over(self.state):
+            self.match = engine.kaiji_settle(self.match, self.role, self.wager, self.outcome)
+        super().show_result(winner)
+        if engine.kaiji_over(self.match):
+            if self.match[1] > 0:
+                text = f"Match over: you take home ¥{engine.kaiji_result(self.match)}M"
+            else:
+                text = "Your stake is used up: the winnings are lost"
+            self.kaiji_label.config(text=text)
+        elif engine.is_over(self.state):
+            self.kaiji_label.config(text=self.get_match_text())
+
+    def show_new_game_button(self):
+        text = "New Kaiji Match" if engine.kaiji_over(self.match) else "Next Bout"
+        btn = tk.Button(self.main_frame, text=text, font=("Arial", 12, "bold"), bg="#4CAF50", fg="white",
+                        command=lambda: (self.play_sound('click'), self.play_again()))
+        btn.pack(pady=20)
+
+    def play_again(self):
+        self.game_over = False
+        self.app.start_kaiji(self.first_role, None if engine.kaiji_over(self.match) else self.match)
+
+
+class CanvasGame(ECardGame):
+    # Same rules, pacing and sounds as ECardGame, drawn on the app's persistent CanvasRenderer.
+    # The slots, labels and banner are CanvasItems, so the round logic above runs unchanged.
+
+    def build_ui(self):
+        view = self.view = self.app.renderer
+        view.show("table")
+        view.set_role_text(f"You are playing as: {self.role}")
+        self.cpu_card_slot = view.cpu_slot
+        self.player_card_slot = view.player_slot
+        self.result_label = view.result_text
+        self.result_banner = view.banner
+        self.score_label = view.score
+        self.remaining_label = view.remaining
+        self.show_card(self.cpu_card_slot, "Back")
+        self.show_card(self.player_card_slot, "Back")
+        self.result_label.config(text="")
+        self.result_banner.config(text="")
+        view.actions.update(
+            sound=self.open_sound_panel,
+            reset=lambda: (self.play_sound('click'), self.reset_score()),
+            clear=lambda: (self.play_sound('click'), self.clear_history()),
+            change_role=lambda: (self.play_sound('click'), self.change_role()),
+            again=lambda: (self.play_sound('click'), self.play_again()),
+        )
+        view.on_card = lambda i: self.play_round(view.hand[i])
+        self.history_rendered = -1  # Force the first history draw
+        self.update_player_hand()
+        self.update_sidebar()
+
+    def update_player_hand(self):
+        self.view.set_hand(self.player_hand)
+
+    def update_sidebar(self):
+        self.score_label.config(text=self.get_score_text())
+        p_cit, p_special, c_cit, c_special = engine.counts(self.state)
+        self.remaining_label.config(text=f"Player cards: {p_cit + p_special}\nCPU cards: {c_cit + c_special}")
+        # Only the rows that fit in the box are drawn, so this costs the same at any history length
+        if self.history_rendered != self.history_total:
+            shown = min(len(self.history), HISTORY_ROWS)
+            first = self.history_total - shown + 1
+            rows = [self.history[j] for j in range(len(self.history) - shown, len(self.history))]
+            self.view.history.config(text="\n".join(
+                f"Round {first + i}: You → {p:<8} | CPU → {c:<8}" for i, (p, c) in enumerate(rows)))
+            self.history_rendered = self.history_total
+
+    def clear_history(self):
+        self.history.clear()
+        self.history_total = 0
+        self.history_rendered = -1
+        self.update_sidebar()
+
+    def show_new_game_button(self):
+        self.view.show_again()
+
+    def refresh_card_images(self):
+        pass  # The canvas layout stays at the base card size
+
+    def teardown(self):
+        super().teardown()
+        # The renderer outlives the game; its callbacks must not keep this one alive
+        for key in ("sound", "reset", "clear", "change_role", "again"):
+            self.view.actions.pop(key, None)
+        self.view.on_card = None
 
 
 if __name__ == "__main__":
+    profiler = instrument.from_env()
+    if profiler:
+        profiler.instrument({
+            ECardGame: PROFILED_GAME,
+            # Subclasses only for the methods they override, so inherited ones are not timed twice
+            **{cls: [name for name in PROFILED_GAME if name in vars(cls)] for cls in (CanvasGame, KaijiGame)},
+            CanvasRenderer: ("set_hand", "show"),
+            ECardApp: PROFILED_APP,
+            FlipFrameCache: ("get", "_build"),
+            FrameScheduler: ("_tick",),
+            AudioService: ("play", "play_music", "set_effects_volume", "set_music_volume"),
+        })
+        profiler.watch_event_loop()
     root = tk.Tk()
     app = ECardApp(root)
     root.mainloop()
+    app.card_images.close()
+    if app.match_log:
+        app.match_log.close()
+    if profiler:
+        profiler.metadata.update(image_cache=app.card_images.stats(), flip_cache=app.flip_cache.stats(),
+                                 image_bytes=app.card_images.bytes + app.flip_cache.bytes,
+                                 scheduler=app.scheduler.stats(), audio=app.audio.stats())
+        profiler.dump(profiler.path)
+        profiler.report()
@@ -1,11 +1,14 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
 
 a = Analysis(
     ['ecarddemo.py'],
     pathex=[],
     binaries=[],
-    datas=[('emperor.jpg', '.'), ('slave.jpg', '.'), ('citizen.jpg', '.'), ('back.jpg', '.'), ('flip.wav', '.'), ('win.wav', '.'), ('lose.wav', '.'), ('draw.wav', '.'), ('click.wav', '.'), ('theme.wav', '.')],
+    datas=[('emperor.jpg', '.'), ('slave.jpg', '.'), ('citizen.jpg', '.'), ('back.jpg', '.'), ('flip.wav', '.'), ('win.wav', '.'), ('lose.wav', '.'), ('draw.wav', '.'), ('click.wav', '.'), ('theme.wav', '.'), ('strategy.json', '.'), ('kaiji.json', '.')]
+    # Built by `python assets.py`; the game falls back to the loose files without it
+    + ([('assets.bundle', '.')] if os.path.exists('assets.bundle') else []),
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
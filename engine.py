@@ -0,0 +1,259 @@
+"""Headless E-Card rules engine.
+
+A match is encoded as a single int so it can be copied, hashed and stored
+for free. Layout (low bit first):
+
+    bits 0-7   player Citizens remaining
+    bit  8     player still holds their special card
+    bits 9-16  CPU Citizens remaining
+    bit  17    CPU still holds their special card
+    bit  18    player is the Emperor side
+    bit  19    match is over
+
+Cards and outcomes are small ints so a round resolves with one lookup into
+OUTCOMES instead of the tuple/dict rules the GUI used to carry.
+"""
+import random
+
+# Card codes
+CITIZEN, EMPEROR, SLAVE = 0, 1, 2
+CARD_NAMES = ("Citizen", "Emperor", "Slave")
+CARD_CODES = {name: code for code, name in enumerate(CARD_NAMES)}
+
+# Outcome codes, always from the player's point of view
+DRAW, PLAYER, CPU = 0, 1, 2
+OUTCOME_NAMES = ("Draw", "Player", "CPU")
+
+ROLES = ("Emperor", "Slave")
+HAND_SIZE = 5
+MAX_CITIZENS = 0xFF
+
+# Kaiji match mode: KAIJI_BOUTS bouts with the sides swapping every KAIJI_SWAP_EVERY.
+# The player stakes KAIJI_STAKE millimetres (of the drill, in the manga) and wagers some of
+# them on each bout: a lost bout uses the wager up, a won one pays wager x KAIJI_PAYOUT[role]
+KAIJI_BOUTS = 12
+KAIJI_SWAP_EVERY = 3
+KAIJI_STAKE = 10
+KAIJI_PAYOUT = {"Emperor": 1, "Slave": 5}
+
+_P_CIT_SHIFT = 0
+_P_SPECIAL = 1 << 8
+_C_CIT_SHIFT = 9
+_C_SPECIAL = 1 << 17
+_P_EMPEROR = 1 << 18
+_OVER = 1 << 19
+_CIT_MASK = 0xFF
+
+
+def _build_outcomes():
+    beats = {(EMPEROR, CITIZEN), (CITIZEN, SLAVE), (SLAVE, EMPEROR)}
+    table = bytearray(9)
+    for p in range(3):
+        for c in range(3):
+            if (p, c) in beats:
+                table[p * 3 + c] = PLAYER
+            elif (c, p) in beats:
+                table[p * 3 + c] = CPU
+    return bytes(table)
+
+
+# OUTCOMES[player_card * 3 + cpu_card] -> DRAW / PLAYER / CPU
+OUTCOMES = _build_outcomes()
+
+
+def special_card(role):
+    return EMPEROR if role == "Emperor" else SLAVE
+
+
+def other_role(role):
+    return "Slave" if role == "Emperor" else "Emperor"
+
+
+def new_match(player_role, hand_size=HAND_SIZE):
+    citizens = hand_size - 1
+    if not 0 <= citizens <= MAX_CITIZENS:
+        raise ValueError(f"hand_size must be between 1 and {MAX_CITIZENS + 1}")
+    state = citizens << _P_CIT_SHIFT | _P_SPECIAL | citizens << _C_CIT_SHIFT | _C_SPECIAL
+    if player_role == "Emperor":
+        state |= _P_EMPEROR
+    elif player_role != "Slave":
+        raise ValueError(f"Unknown role: {player_role!r}")
+    return state
+
+
+def player_role(state):
+    return "Emperor" if state & _P_EMPEROR else "Slave"
+
+
+def cpu_role(state):
+    return "Slave" if state & _P_EMPEROR else "Emperor"
+
+
+def counts(state):
+    # (player citizens, player special held, cpu citizens, cpu special held)
+    return (state & _CIT_MASK, bool(state & _P_SPECIAL),
+            state >> _C_CIT_SHIFT & _CIT_MASK, bool(state & _C_SPECIAL))
+
+
+def swap_sides(state):
+    # The same position seen from the other seat, so any CPU policy can also sit as the player
+    return ((state >> _C_CIT_SHIFT & _CIT_MASK) << _P_CIT_SHIFT
+            | (state >> _P_CIT_SHIFT & _CIT_MASK) << _C_CIT_SHIFT
+            | (_P_SPECIAL if state & _C_SPECIAL else 0)
+            | (_C_SPECIAL if state & _P_SPECIAL else 0)
+            | (state & _P_EMPEROR) ^ _P_EMPEROR
+            | state & _OVER)
+
+
+def is_over(state):
+    return bool(state & _OVER)
+
+
+def cards_left(state):
+    return (state & _CIT_MASK) + bool(state & _P_SPECIAL)
+
+
+def _hand(citizens, special, special_code):
+    # Same order init_hand always used: special first, then the Citizens
+    return ([CARD_NAMES[special_code]] if special else []) + ["Citizen"] * citizens
+
+
+def player_hand(state):
+    special = EMPEROR if state & _P_EMPEROR else SLAVE
+    return _hand(state & _CIT_MASK, state & _P_SPECIAL, special)
+
+
+def cpu_hand(state):
+    special = SLAVE if state & _P_EMPEROR else EMPEROR
+    return _hand(state >> _C_CIT_SHIFT & _CIT_MASK, state & _C_SPECIAL, special)
+
+
+def init_hand(role, hand_size=HAND_SIZE):
+    return _hand(hand_size - 1, True, special_card(role))
+
+
+def resolve(player_card, cpu_card):
+    return OUTCOMES[player_card * 3 + cpu_card]
+
+
+def play(state, player_card, cpu_card):
+    """Play one round with card codes and return (new_state, outcome)."""
+    if state & _OVER:
+        raise ValueError("Match is already over")
+    emperor = state & _P_EMPEROR
+    if player_card == CITIZEN:
+        if not state & _CIT_MASK:
+            raise ValueError("Player has no Citizen left")
+        state -= 1 << _P_CIT_SHIFT
+    elif player_card == (EMPEROR if emperor else SLAVE) and state & _P_SPECIAL:
+        state ^= _P_SPECIAL
+    else:
+        raise ValueError(f"Player does not hold {CARD_NAMES[player_card]}")
+    if cpu_card == CITIZEN:
+        if not state >> _C_CIT_SHIFT & _CIT_MASK:
+            raise ValueError("CPU has no Citizen left")
+        state -= 1 << _C_CIT_SHIFT
+    elif cpu_card == (SLAVE if emperor else EMPEROR) and state & _C_SPECIAL:
+        state ^= _C_SPECIAL
+    else:
+        raise ValueError(f"CPU does not hold {CARD_NAMES[cpu_card]}")
+    outcome = OUTCOMES[player_card * 3 + cpu_card]
+    if outcome or not (state & (_CIT_MASK | _P_SPECIAL)):
+        state |= _OVER
+    return state, outcome
+
+
+# Memoized transitions: (state << 4 | player_card << 2 | cpu_card) -> (state, outcome).
+# The reachable state space is tiny, so after warm-up every round is one dict hit.
+_TRANSITIONS = {}
+
+
+def step(state, player_card, cpu_card):
+    """Same as play() but served from the transition table once seen."""
+    key = state << 4 | player_card << 2 | cpu_card
+    result = _TRANSITIONS.get(key)
+    if result is None:
+        result = _TRANSITIONS[key] = play(state, player_card, cpu_card)
+    return result
+
+
+def random_cpu_card(state, rng=random):
+    # Uniform over the cards in hand, like random.choice(cpu_hand)
+    citizens = state >> _C_CIT_SHIFT & _CIT_MASK
+    special = 1 if state & _C_SPECIAL else 0
+    if special and rng.random() * (citizens + special) < 1:
+        return SLAVE if state & _P_EMPEROR else EMPEROR
+    return CITIZEN
+
+
+def random_player_card(state, rng=random):
+    citizens = state & _CIT_MASK
+    special = 1 if state & _P_SPECIAL else 0
+    if special and rng.random() * (citizens + special) < 1:
+        return EMPEROR if state & _P_EMPEROR else SLAVE
+    return CITIZEN
+
+
+def play_random_match(role="Emperor", hand_size=HAND_SIZE, rng=random):
+    # Both sides pick uniformly at random; returns (outcome, rounds played)
+    state = new_match(role, hand_size)
+    rounds = 0
+    while True:
+        state, outcome = step(state, random_player_card(state, rng), random_cpu_card(state, rng))
+        rounds += 1
+        if state & _OVER:
+            return outcome, rounds
+
+
+def kaiji_role(bout, first_role="Emperor"):
+    # The player's side in bout (0-based)
+    return first_role if bout // KAIJI_SWAP_EVERY % 2 == 0 else other_role(first_role)
+
+
+def new_kaiji_match(stake=KAIJI_STAKE):
+    # (bouts played, stake left, winnings)
+    return (0, stake, 0)
+
+
+def kaiji_settle(match, role, wager, outcome):
+    # The match after a bout the player played as role with this wager
+    bout, stake, winnings = match
+    if not 1 <= wager <= stake:
+        raise ValueError(f"wager must be between 1 and {stake}")
+    if outcome == PLAYER:
+        return (bout + 1, stake, winnings + wager * KAIJI_PAYOUT[role])
+    if outcome == CPU:
+        return (bout + 1, stake - wager, winnings)
+    return (bout + 1, stake, winnings)
+
+
+def kaiji_over(match, bouts=KAIJI_BOUTS):
+    return match[0] >= bouts or match[1] <= 0
+
+
+def kaiji_result(match):
+    # Winnings are only paid out if the stake is not used up
+    return match[2] if match[1] > 0 else 0
+
+
+if __name__ == "__main__":
+    import time
+    rng = random.Random(0)
+    n = 200_000
+    start = time.perf_counter()
+    total_rounds = 0
+    for i in range(n):
+        total_rounds += play_random_match(ROLES[i & 1], rng=rng)[1]
+    elapsed = time.perf_counter() - start
+    print(f"{n} random matches, {total_rounds} rounds in {elapsed:.2f}s "
+          f"({total_rounds / elapsed:,.0f} rounds/s incl. RNG)")
+    state = new_match("Emperor")
+    start = time.perf_counter()
+    for _ in range(n):
+        step(state, CITIZEN, CITIZEN)
+        step(state, EMPEROR, CITIZEN)
+        step(state, CITIZEN, SLAVE)
+        step(state, EMPEROR, SLAVE)
+        step(state, CITIZEN, CITIZEN)
+    elapsed = time.perf_counter() - start
+    print(f"step(): {5 * n / elapsed:,.0f} rounds/s")
@@ -0,0 +1,159 @@
+"""Cache of pre-built card flip animation frames.
+
+A flip is 2 * steps frames: from_card shrinking horizontally, then to_card
+growing back. Frames are keyed by (from_card, to_card, steps, size) and kept
+in a small LRU so a reveal only swaps ready PhotoImages. Flips warmed up but
+not shown yet count against the same bound, and retain(size) drops every
+other size when the window is resized; stats() reports the bytes held.
+
+PIL resizing is thread safe and can run on a worker thread (warm()), but
+ImageTk.PhotoImage must be created on the Tk thread, so that last step
+happens on the first get() of each key.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import ImageTk
+
+
+def flip_frames(pil_from, pil_to, steps, scaled=None):
+    # Shrink, swap, expand: the same widths flip_card_animation always used.
+    # scaled(which, size) may return a ready-made frame (e.g. from the asset bundle).
+    w, h = pil_from.size
+    frames = []
+    for which, img, widths in (
+        (0, pil_from, [max(1, int(w * (1 - i / steps))) for i in range(steps)]),
+        (1, pil_to, [max(1, int(w * (i + 1) / steps)) for i in range(steps)]),
+    ):
+        for new_w in widths:
+            frame = scaled(which, (new_w, h)) if scaled else None
+            frames.append(frame if frame is not None else img.resize((new_w, h)))
+    return frames
+
+
+class FlipFrameCache:
+    def __init__(self, pil_images, max_entries=16, bundle=None, scale=None):
+        self.pil_images = pil_images
+        self.bundle = bundle  # optional assets.AssetBundle with pre-scaled frames
+        self.scale = scale  # optional scale(name, size) -> PIL image, for sizes other than pil_images'
+        self.max_entries = max_entries  # ready and pending flips together
+        self._frames = OrderedDict()  # key -> list of PhotoImage
+        self._pending = OrderedDict()  # key -> list of PIL images built off the Tk thread
+        self._bytes = {}  # key -> bytes of its frames (4 per pixel, PIL or Tk copy)
+        self._lock = threading.Lock()
+        self.size = None  # once retain() is called, warm-ups for other sizes are dropped
+        self.bytes = 0
+        self.hits = 0  # includes warm_hits
+        self.warm_hits = 0  # served from a warm-up, only the PhotoImages made
+        self.misses = 0  # frames built on the Tk thread
+        self.evicted = 0
+        self.generate_seconds = 0.0
+
+    def _build(self, key):
+        from_card, to_card, steps, size = key
+        start = time.perf_counter()
+        pil_from = self.pil_images[from_card]
+        pil_to = self.pil_images[to_card]
+        if pil_from.size != size:
+            pil_from = self.scale(from_card, size) if self.scale else pil_from.resize(size)
+        if pil_to.size != size:
+            pil_to = self.scale(to_card, size) if self.scale else pil_to.resize(size)
+        scaled = None
+        if self.bundle is not None:
+            names = (from_card, to_card)
+            scaled = lambda which, frame_size: self.bundle.image(names[which], frame_size)
+        frames = flip_frames(pil_from, pil_to, steps, scaled)
+        with self._lock:
+            self.generate_seconds += time.perf_counter() - start
+        return frames
+
+    def warm(self, keys):
+        # Resize frames for keys on a daemon thread; PhotoImages are made on first use
+        def worker():
+            for key in keys:
+                with self._lock:
+                    if key in self._frames or key in self._pending or not self._wanted(key):
+                        continue
+                frames = self._build(key)
+                with self._lock:
+                    # The window may have settled on another size while this was resizing
+                    if self._wanted(key) and key not in self._frames and key not in self._pending:
+                        self._pending[key] = frames
+                        self._charge(key, frames)
+                        self._evict()
+        thread = threading.Thread(target=worker, name="flip-frame-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def retain(self, size):
+        # Drop ready and pending flips of every other size (the window was resized)
+        with self._lock:
+            self.size = size
+            for entries in (self._frames, self._pending):
+                for key in [k for k in entries if k[3] != size]:
+                    del entries[key]
+                    self._uncharge(key)
+                    self.evicted += 1
+
+    def get(self, from_card, to_card, steps=8, size=None):
+        size = size or self.pil_images[from_card].size
+        key = (from_card, to_card, steps, size)
+        frames = self._frames.get(key)
+        if frames is not None:
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frames
+        with self._lock:
+            pil_frames = self._pending.pop(key, None)
+            if pil_frames is not None:
+                self._uncharge(key)
+        if pil_frames is None:
+            self.misses += 1
+            pil_frames = self._build(key)
+        else:
+            self.hits += 1
+            self.warm_hits += 1
+        start = time.perf_counter()
+        frames = [ImageTk.PhotoImage(img) for img in pil_frames]
+        with self._lock:
+            self.generate_seconds += time.perf_counter() - start
+            self._frames[key] = frames
+            self._charge(key, pil_frames)
+            self._evict()
+        return frames
+
+    # Called with _lock held
+
+    def _wanted(self, key):
+        return self.size is None or key[3] == self.size
+
+    def _charge(self, key, frames):
+        n = sum(img.size[0] * img.size[1] * 4 for img in frames)
+        self._bytes[key] = n
+        self.bytes += n
+
+    def _uncharge(self, key):
+        self.bytes -= self._bytes.pop(key, 0)
+
+    def _evict(self):
+        # Pending flips go first: they are only a warm-up guess, ready ones were actually shown
+        while len(self._frames) + len(self._pending) > self.max_entries:
+            entries = self._pending if self._pending else self._frames
+            key, _ = entries.popitem(last=False)
+            self._uncharge(key)
+            self.evicted += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "warm_hits": self.warm_hits,
+                "misses": self.misses,
+                "entries": len(self._frames),
+                "pending": len(self._pending),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "evicted": self.evicted,
+                "generate_seconds": self.generate_seconds,
+            }
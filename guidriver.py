@@ -0,0 +1,175 @@
+"""Drive the real GUI from a click script and measure GUI rounds/second.
+
+The app runs on a scheduler.VirtualClock, so the 1 s pauses, flip frames
+and 2.5 s banners in ECardGame fire as soon as the previous step is done,
+with every frame still drawn. With --speed the real clock is used instead,
+scaled. The CPU draws from a seeded RNG, so a script replays identically.
+
+A script is a JSON list of events:
+
+    ["role", "Emperor"]     start a match as this role (Change Role if one is running)
+    ["card", "Citizen"]     click this card in the hand
+    ["again"]               click Play Again
+
+Events come from a file (--replay), from the match log (--from-log, each
+recorded match becomes a role event plus its cards), or are generated with
+random legal clicks. Events that no longer apply (a card not in the hand, a
+card after the match ended) are skipped and counted.
+
+Runs unattended through harness.py (silent audio, temporary match log;
+needs a display).
+
+    python guidriver.py --matches 500 --record clicks.json
+    python guidriver.py --replay clicks.json --renderer canvas --min-rounds-per-sec 50
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tkinter as tk
+
+import harness  # before ecarddemo: silent audio and a temporary match log
+import analytics
+import engine
+import ecarddemo
+from scheduler import VirtualClock
+
+
+def generate_events(app, rng, matches, role_every=10):
+    # Random legal clicks, chosen against the live game state as the driver asks for them
+    role = engine.ROLES[0]
+    yield ["role", role]
+    finished = 0
+    while True:
+        game = app.game
+        if not game.game_over:
+            yield ["card", rng.choice(game.player_hand)]
+            continue
+        finished += 1
+        if finished >= matches:
+            return
+        if finished % role_every == 0:
+            role = engine.other_role(role)
+            yield ["role", role]
+        else:
+            yield ["again"]
+
+
+def events_from_log(path, limit=None):
+    events = []
+    for n, (_, role, rounds, _, _) in enumerate(analytics.iter_matches(path)):
+        if limit is not None and n >= limit:
+            break
+        events.append(["role", role])
+        events.extend(["card", engine.CARD_NAMES[p]] for p, _, _ in rounds)
+    return events
+
+
+class GuiDriver:
+    def __init__(self, root, app):
+        self.root = root
+        self.app = app
+        self.rounds = 0
+        self.matches = 0
+        self.skipped = 0
+        self.applied = []  # the events actually played, for --record
+
+    def apply(self, event):
+        kind = event[0]
+        game = self.app.game
+        if kind == "role":
+            if game is not None:
+                game.change_role()
+            self.app.start_game(event[1], self.app.player_score, self.app.cpu_score)
+        elif kind == "again" and game is not None and game.game_over:
+            game.play_again()
+        elif kind == "card" and game is not None and not game.game_over and event[1] in game.player_hand:
+            game.play_round(event[1])
+            self.rounds += 1
+        else:
+            self.skipped += 1
+            return
+        self.applied.append(list(event))
+        self.settle()
+        if kind == "card" and self.app.game.game_over:
+            self.matches += 1
+
+    def settle(self):
+        # Let the round play out: timers, both flips, the result and its banner
+        scheduler = self.app.scheduler
+        if scheduler.virtual:
+            scheduler.drain()
+        else:
+            while not scheduler.idle():
+                self.root.update()
+                time.sleep(0.001)
+        self.root.update()
+
+    def run(self, events):
+        start = time.perf_counter()
+        for event in events:
+            self.apply(event)
+        elapsed = time.perf_counter() - start
+        return {
+            "rounds": self.rounds,
+            "matches": self.matches,
+            "skipped": self.skipped,
+            "seconds": elapsed,
+            "rounds_per_sec": self.rounds / elapsed if elapsed else 0.0,
+            "matches_per_sec": self.matches / elapsed if elapsed else 0.0,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay or generate clicks through the GUI and report rounds/s")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--replay", help="JSON event list to play")
+    source.add_argument("--from-log", help="replay the player's cards from a match log")
+    parser.add_argument("--matches", type=int, default=200, help="matches to generate (or take from the log)")
+    parser.add_argument("--renderer", choices=("widgets", "canvas"), default="widgets")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speed", type=float, help="use the real clock sped up this much instead of a virtual one")
+    parser.add_argument("--record", help="write the events that were played here")
+    parser.add_argument("--json", help="write the throughput report here")
+    parser.add_argument("--min-rounds-per-sec", type=float, help="exit non-zero below this")
+    args = parser.parse_args(argv)
+
+    root = tk.Tk()
+    clock = None if args.speed else VirtualClock()
+    app = ecarddemo.ECardApp(root, renderer=args.renderer, seed=args.seed, clock=clock)
+    if args.speed:
+        app.scheduler.speed = args.speed
+    root.update()
+    driver = GuiDriver(root, app)
+    if args.replay:
+        with open(args.replay) as f:
+            events = json.load(f)
+    elif args.from_log:
+        events = events_from_log(args.from_log, args.matches)
+    else:
+        events = generate_events(app, random.Random(args.seed + 1), args.matches)
+    result = driver.run(events)
+    result.update(renderer=args.renderer, clock="virtual" if clock else f"real x{args.speed:g}", seed=args.seed,
+                  scheduler=app.scheduler.stats(), audio=app.audio.stats())
+    harness.close_app(app)
+    root.destroy()
+
+    if args.record:
+        with open(args.record, "w") as f:
+            json.dump(driver.applied, f)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    print(f"{result['rounds']} rounds / {result['matches']} matches in {result['seconds']:.2f}s: "
+          f"{result['rounds_per_sec']:.1f} rounds/s ({result['skipped']} events skipped)")
+    frames = result["scheduler"]
+    print(f"frames: {frames['frames_shown']} shown, {frames['frames_dropped']} dropped")
+    if args.min_rounds_per_sec and result["rounds_per_sec"] < args.min_rounds_per_sec:
+        print(f"FAIL: below {args.min_rounds_per_sec} rounds/s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
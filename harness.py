@@ -0,0 +1,33 @@
+"""Shared set-up for the scripts that run the real GUI unattended.
+
+guidriver.py, soak.py and the benchmarks import this before ecarddemo. On
+import it selects the silent audio backend (and SDL's dummy driver) and
+points the match log at a temporary folder, unless ECARD_AUDIO or
+ECARD_LOG_DIR are already set, so automated runs never touch the player's
+~/.ecard. Anything that opens a window needs a display; on a headless
+machine run under an Xvfb server (xvfb-run).
+"""
+import os
+import tempfile
+import tkinter as tk
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("ECARD_AUDIO", "null")
+if "ECARD_LOG_DIR" not in os.environ:
+    os.environ["ECARD_LOG_DIR"] = tempfile.mkdtemp(prefix="ecard-headless-")
+
+
+def live_widgets(widget):
+    return sum(1 + live_widgets(child) for child in widget.winfo_children())
+
+
+def canvas_items(root):
+    return sum(len(w.find_all()) for w in root.winfo_children() if isinstance(w, tk.Canvas))
+
+
+def close_app(app):
+    # Stop the app's worker threads and flush its log before the root is destroyed
+    app.audio.close()
+    app.card_images.close()
+    if app.match_log:
+        app.match_log.close()
@@ -0,0 +1,175 @@
+"""Optimal wagers for the Kaiji match mode (engine.KAIJI_*).
+
+A Kaiji match state is (bouts played, stake left, winnings). Within a bout
+nothing about the wager changes the cards: a bout is won or lost outright
+(both sides always hold the same number of Citizens, so it never draws),
+which makes the per-bout equilibrium in solver.py optimal whatever is at
+stake, and the player wins a bout as the Emperor with P(Emperor wins) and
+as the Slave with the rest. What remains is the wager, solved here by
+memoized value iteration over every reachable state, maximizing expected
+final winnings:
+
+    V(b, s, w) = 0                                  if s == 0
+               = w                                  if b == KAIJI_BOUTS
+               = max over 1 <= x <= s of
+                     q * V(b + 1, s, w + x * payout) + (1 - q) * V(b + 1, s - x, w)
+
+The tables are written to JSON and loaded by ECardApp at startup, so the
+suggested wager is a dict lookup and a bisect. Only the winnings where the
+best wager changes are stored, which keeps a table to a few kilobytes:
+
+    python kaijisolver.py -o kaiji.json
+    python kaijisolver.py --report 10 20 30
+"""
+import argparse
+import bisect
+import json
+import os
+import time
+
+import engine
+import solver
+
+DEFAULT_TABLE = "kaiji.json"
+
+
+def bout_win_probability(role, hand_size=engine.HAND_SIZE):
+    # Both sides playing the equilibrium of solver.py
+    emperor = float(solver.solve_state(hand_size - 1)[2])
+    return emperor if role == "Emperor" else 1 - emperor
+
+
+def solve_match(stake=engine.KAIJI_STAKE, first_role="Emperor", hand_size=engine.HAND_SIZE,
+                bouts=engine.KAIJI_BOUTS):
+    """Solve every state reachable from a new match.
+
+    Returns {(bout, stake, winnings): (expected final winnings, best wager)}."""
+    win = {role: bout_win_probability(role, hand_size) for role in engine.ROLES}
+    memo = {}
+
+    def value(match):
+        bout, left, winnings = match
+        if left <= 0:
+            return 0.0
+        if bout >= bouts:
+            return float(winnings)
+        entry = memo.get(match)
+        if entry is None:
+            role = engine.kaiji_role(bout, first_role)
+            q = win[role]
+            best = None
+            # Larger wagers first, so ties go to the bolder bet
+            for wager in range(left, 0, -1):
+                v = (q * value(engine.kaiji_settle(match, role, wager, engine.PLAYER))
+                     + (1 - q) * value(engine.kaiji_settle(match, role, wager, engine.CPU)))
+                if best is None or v > best[0]:
+                    best = (v, wager)
+            entry = memo[match] = best
+        return entry[0]
+
+    value(engine.new_kaiji_match(stake))
+    return memo
+
+
+def table_key(hand_size, stake, first_role):
+    return f"{hand_size}/{stake}/{first_role}"
+
+
+def wager_runs(solved):
+    # {"bout/stake": [[winnings, wager], ...]} keeping only the winnings where the best wager
+    # changes; neighbouring winnings nearly always share a wager, which keeps the file small
+    runs = {}
+    for (bout, left, winnings), (_, wager) in sorted(solved.items()):
+        row = runs.setdefault(f"{bout}/{left}", [])
+        if not row or row[-1][1] != wager:
+            row.append([winnings, wager])
+    return runs
+
+
+def build_tables(hand_size=engine.HAND_SIZE, stake=engine.KAIJI_STAKE):
+    tables = {}
+    for first_role in engine.ROLES:
+        solved = solve_match(stake, first_role, hand_size)
+        tables[table_key(hand_size, stake, first_role)] = {
+            "value": solved[engine.new_kaiji_match(stake)][0],
+            "states": len(solved),
+            "wagers": wager_runs(solved),
+        }
+    return {"version": 1, "bouts": engine.KAIJI_BOUTS, "payout": engine.KAIJI_PAYOUT, "tables": tables}
+
+
+def save_tables(path, hand_size=engine.HAND_SIZE, stake=engine.KAIJI_STAKE):
+    with open(path, "w") as f:
+        json.dump(build_tables(hand_size, stake), f, separators=(",", ":"))
+
+
+class WagerTable:
+    # Best wager for every reachable (bout, stake, winnings) of one match setup
+
+    def __init__(self, runs, value, stake, first_role, hand_size):
+        # runs: wager_runs() output; split per (bout, stake) into starts for bisect
+        self.runs = {tuple(map(int, key.split("/"))): ([w for w, _ in row], [x for _, x in row])
+                     for key, row in runs.items()}
+        self.value = value  # expected final winnings of a new match
+        self.stake = stake
+        self.first_role = first_role
+        self.hand_size = hand_size
+
+    @classmethod
+    def solved(cls, stake=engine.KAIJI_STAKE, first_role="Emperor", hand_size=engine.HAND_SIZE):
+        solved = solve_match(stake, first_role, hand_size)
+        return cls(wager_runs(solved), solved[engine.new_kaiji_match(stake)][0], stake, first_role, hand_size)
+
+    @classmethod
+    def load(cls, path, stake=engine.KAIJI_STAKE, first_role="Emperor", hand_size=engine.HAND_SIZE):
+        # Fall back to solving in place if the file is missing, stale or lacks this setup
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data["bouts"] != engine.KAIJI_BOUTS or data["payout"] != engine.KAIJI_PAYOUT:
+                raise ValueError("table solved for other rules")
+            table = data["tables"][table_key(hand_size, stake, first_role)]
+            return cls(table["wagers"], table["value"], stake, first_role, hand_size)
+        except (OSError, KeyError, ValueError):
+            return cls.solved(stake, first_role, hand_size)
+
+    def wager(self, match):
+        # Exact for every state a match can reach; anything else gets a safe single millimetre
+        bout, left, winnings = match
+        row = self.runs.get((bout, left))
+        if row is None:
+            return 1
+        i = bisect.bisect_right(row[0], winnings) - 1
+        return row[1][i] if i >= 0 else 1
+
+
+def report(stakes, hand_size=engine.HAND_SIZE):
+    for stake in stakes:
+        start = time.perf_counter()
+        tables = build_tables(hand_size, stake)
+        elapsed = time.perf_counter() - start
+        size = len(json.dumps(tables, separators=(",", ":")))
+        states = sum(t["states"] for t in tables["tables"].values())
+        values = ", ".join(f"{role} first {tables['tables'][table_key(hand_size, stake, role)]['value']:.2f}"
+                           for role in engine.ROLES)
+        print(f"stake {stake:>3}: {states:,} states solved in {elapsed * 1000:.1f} ms, "
+              f"table {size:,} bytes, expected winnings {values}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve the Kaiji match wager tables")
+    parser.add_argument("--stake", type=int, default=engine.KAIJI_STAKE)
+    parser.add_argument("--hand-size", type=int, default=engine.HAND_SIZE)
+    parser.add_argument("-o", "--output", default=DEFAULT_TABLE)
+    parser.add_argument("--report", type=int, nargs="*", metavar="STAKE",
+                        help="print solve time and table size for these stakes instead")
+    args = parser.parse_args(argv)
+    if args.report is not None:
+        report(args.report or [5, 10, 20, 30], args.hand_size)
+        return
+    save_tables(args.output, args.hand_size, args.stake)
+    print(f"Wrote {args.output} ({os.path.getsize(args.output):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
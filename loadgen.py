@@ -0,0 +1,131 @@
+"""Load generator for server.py.
+
+Opens many connections, each playing matches back to back with a uniformly
+random player, and reports matches/second, p50/p99 round latency as seen by
+the client, and the server's own stats. With --local it starts the server in
+the same event loop, so one command measures everything:
+
+    python loadgen.py --local --connections 2000 --matches 20
+    python loadgen.py --port 7450 --connections 500 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import engine
+import server
+
+ROLE_CODES = {"Emperor": 0, "Slave": 1}
+
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def request(reader, writer, kind, a=0, b=0):
+    writer.write(server.MSG.pack(kind, a, b, 0))
+    reply = await reader.readexactly(server.MSG.size)
+    if reply[0] == server.STATS_REPLY:
+        length = int.from_bytes(reply[1:], "big")
+        return json.loads(await reader.readexactly(length))
+    return server.MSG.unpack(reply)
+
+
+async def client(args, rng, latencies, deadline, counts):
+    reader, writer = await open_connection(args)
+    try:
+        for i in range(args.matches):
+            if deadline and time.perf_counter() > deadline:
+                break
+            role = engine.ROLES[rng.getrandbits(1)]
+            await request(reader, writer, server.NEW, ROLE_CODES[role], args.hand_size)
+            # Mirror the match locally to choose only cards that are still in hand
+            state = engine.new_match(role, args.hand_size)
+            while True:
+                card = engine.random_player_card(state, rng)
+                start = time.perf_counter()
+                kind, cpu_card, flags, _ = await request(reader, writer, server.PLAY, card)
+                latencies.append(time.perf_counter() - start)
+                if kind != server.RESULT:
+                    raise RuntimeError(f"server error {cpu_card}")
+                state, _ = engine.play(state, card, cpu_card)
+                if flags >> 2:
+                    counts[0] += 1
+                    break
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run(args):
+    local = None
+    if args.local:
+        game = server.GameServer(args.seed, trace_memory=args.trace_memory, cpu=args.cpu)
+        local = await server.start_server(game, args.host, args.port, args.unix)
+    rng = random.Random(args.seed)
+    latencies = []
+    counts = [0]
+    start = time.perf_counter()
+    deadline = start + args.duration if args.duration else None
+    # Stagger connection setup so the listen backlog is not overrun
+    tasks = []
+    for i in range(args.connections):
+        tasks.append(asyncio.create_task(client(args, random.Random(rng.random()), latencies, deadline, counts)))
+        if i % 200 == 199:
+            await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await open_connection(args)
+    server_stats = await request(reader, writer, server.STATS)
+    writer.close()
+    await writer.wait_closed()
+    if local:
+        # Let the server side notice every disconnect before shutting it down
+        for _ in range(500):
+            if not game.connections:
+                break
+            await asyncio.sleep(0.01)
+        local.close()
+        await local.wait_closed()
+
+    latencies.sort()
+    report = {
+        "connections": args.connections,
+        "matches": counts[0],
+        "rounds": len(latencies),
+        "seconds": elapsed,
+        "matches_per_sec": counts[0] / elapsed,
+        "round_p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+        "round_p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else None,
+        "server": server_stats,
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive server.py with many concurrent tables")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    parser.add_argument("--unix", help="connect over this Unix socket path")
+    parser.add_argument("--local", action="store_true", help="run the server in this process")
+    parser.add_argument("--cpu", choices=("equilibrium", "adaptive"), default="equilibrium",
+                        help="with --local, the server's CPU policy")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="with --local, have the server report bytes per connection")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--matches", type=int, default=10, help="matches per connection")
+    parser.add_argument("--duration", type=float, default=0.0, help="stop starting matches after N seconds")
+    parser.add_argument("--hand-size", type=int, default=engine.HAND_SIZE)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
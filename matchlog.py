@@ -0,0 +1,231 @@
+"""Append-only binary log of every round and match outcome.
+
+The log is a stream of 4-byte records:
+
+    START    [1, role, hand_size, check]
+    ROUND    [2, player_card | cpu_card << 2 | outcome << 4, round_no, check]
+    END      [3, outcome | abandoned << 2, rounds, check]
+    SESSION  [4, session & 0xFF, session >> 8 & 0xFF, check]
+
+role 0 = Emperor, 1 = Slave; cards and outcomes are engine codes; check is
+the XOR of the first three bytes with 0xA5 so torn writes can be detected.
+A SESSION record precedes the first START of every session.
+
+A sidecar ``.idx`` file holds one 16-byte entry per match
+(session u32, match u32, byte offset of START u64), so the last N matches
+are found by seeking from the end of the index instead of scanning the log.
+
+Writes are buffered and fsynced in batches (every sync_every records and on
+close). On open, a torn tail is truncated, index entries past the end of the
+log are dropped, and matches written after the last index entry are
+re-indexed under the session their SESSION records name, so a crash loses
+at most the unsynced batch.
+"""
+import os
+import struct
+
+import engine
+
+RECORD = struct.Struct("4B")
+INDEX = struct.Struct("<IIQ")
+START, ROUND, END, SESSION = 1, 2, 3, 4
+ROLE_CODES = {"Emperor": 0, "Slave": 1}
+ROLES = ("Emperor", "Slave")
+DEFAULT_NAME = "matches.log"
+
+
+def _check(a, b, c):
+    return a ^ b ^ c ^ 0xA5
+
+
+def _record(kind, a, b):
+    return RECORD.pack(kind, a, b, _check(kind, a, b))
+
+
+def _valid(raw):
+    kind, a, b, check = raw
+    return kind in (START, ROUND, END, SESSION) and check == _check(kind, a, b)
+
+
+def default_log_dir():
+    return os.environ.get("ECARD_LOG_DIR") or os.path.join(os.path.expanduser("~"), ".ecard")
+
+
+class MatchLog:
+    def __init__(self, path, sync_every=64):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.sync_every = sync_every
+        self._buffer = []
+        self._index_buffer = []
+        self._unsynced = 0
+        self._log = open(path, "ab+")
+        self._index = open(self.index_path, "ab+")
+        self.recover()
+        self.session = self._last_session() + 1
+        self.match = 0
+        self.round_no = 0
+        self.in_match = False
+
+    # Recovery
+
+    def recover(self):
+        size = self._log.seek(0, os.SEEK_END)
+        size -= size % RECORD.size
+        # Walk back over trailing records that fail their check (a torn batch)
+        while size:
+            self._log.seek(size - RECORD.size)
+            if _valid(self._log.read(RECORD.size)):
+                break
+            size -= RECORD.size
+        self._log.truncate(size)
+
+        index_size = self._index.seek(0, os.SEEK_END)
+        index_size -= index_size % INDEX.size
+        last_offset = -1
+        last_session = last_match = 0
+        while index_size:
+            self._index.seek(index_size - INDEX.size)
+            session, match, offset = INDEX.unpack(self._index.read(INDEX.size))
+            if offset < size:
+                last_offset, last_session, last_match = offset, session, match
+                break
+            index_size -= INDEX.size
+        self._index.truncate(index_size)
+
+        # Re-index matches that reached the log but not the index before a crash. A SESSION
+        # record starts a newer session; it only holds the low 16 bits of the number
+        self._log.seek(last_offset + RECORD.size if last_offset >= 0 else 0)
+        offset = self._log.tell()
+        missing = []
+        while offset < size:
+            kind, a, b, _ = self._log.read(RECORD.size)
+            if kind == SESSION:
+                last_session += ((a | b << 8) - last_session - 1 & 0xFFFF) + 1
+                last_match = 0
+            elif kind == START:
+                last_match += 1
+                missing.append(INDEX.pack(last_session or 1, last_match, offset))
+            offset += RECORD.size
+        if missing:
+            self._index.write(b"".join(missing))
+            self._sync()
+
+    def _last_session(self):
+        end = self._index.seek(0, os.SEEK_END)
+        if not end:
+            return 0
+        self._index.seek(end - INDEX.size)
+        return INDEX.unpack(self._index.read(INDEX.size))[0]
+
+    # Writing
+
+    def start_match(self, role, hand_size=engine.HAND_SIZE):
+        if self.in_match:
+            self.end_match(engine.DRAW, abandoned=True)
+        if not self.match:
+            self._append(_record(SESSION, self.session & 0xFF, self.session >> 8 & 0xFF))
+        self.match += 1
+        self.round_no = 0
+        self.in_match = True
+        offset = self._log.seek(0, os.SEEK_END) + sum(len(r) for r in self._buffer)
+        self._index_buffer.append(INDEX.pack(self.session, self.match, offset))
+        self._append(_record(START, ROLE_CODES[role], hand_size & 0xFF))
+
+    def log_round(self, player_card, cpu_card, outcome):
+        self.round_no += 1
+        self._append(_record(ROUND, player_card | cpu_card << 2 | outcome << 4, self.round_no & 0xFF))
+
+    def end_match(self, outcome, abandoned=False):
+        if not self.in_match:
+            return
+        self.in_match = False
+        self._append(_record(END, outcome | abandoned << 2, self.round_no & 0xFF))
+
+    def _append(self, record):
+        self._buffer.append(record)
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.flush()
+
+    def flush(self):
+        # Log before index, so an index entry never points past the synced log
+        if self._buffer:
+            self._log.seek(0, os.SEEK_END)
+            self._log.write(b"".join(self._buffer))
+            self._buffer = []
+            self._log.flush()
+            os.fsync(self._log.fileno())
+        if self._index_buffer:
+            self._index.seek(0, os.SEEK_END)
+            self._index.write(b"".join(self._index_buffer))
+            self._index_buffer = []
+            self._sync()
+        self._unsynced = 0
+
+    def _sync(self):
+        self._index.flush()
+        os.fsync(self._index.fileno())
+
+    def close(self):
+        self.flush()
+        self._log.close()
+        self._index.close()
+
+    # Reading
+
+    def last_matches(self, n):
+        """Return up to n most recent matches (oldest first), using only the index tail."""
+        self.flush()
+        end = self._index.seek(0, os.SEEK_END)
+        count = min(n, end // INDEX.size)
+        self._index.seek(end - count * INDEX.size)
+        entries = [INDEX.unpack(self._index.read(INDEX.size)) for _ in range(count)]
+        log_end = self._log.seek(0, os.SEEK_END)
+        matches = []
+        for i, (session, match, offset) in enumerate(entries):
+            stop = entries[i + 1][2] if i + 1 < count else log_end
+            self._log.seek(offset)
+            matches.append(_decode_match(session, match, self._log.read(stop - offset)))
+        return matches
+
+
+def _decode_match(session, match, data):
+    result = {"session": session, "match": match, "role": None, "hand_size": None,
+              "rounds": [], "outcome": None, "abandoned": False}
+    for kind, a, b, _ in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+        if kind == START:
+            result["role"], result["hand_size"] = ROLES[a], b
+        elif kind == ROUND:
+            result["rounds"].append((a & 3, a >> 2 & 3, a >> 4 & 3))
+        elif kind == END:
+            result["outcome"] = a & 3
+            result["abandoned"] = bool(a >> 2 & 1)
+    return result
+
+
+def iter_records(path, start=0, chunk_records=65536):
+    """Yield (byte offset, kind, a, b) for every valid record from start, in chunks."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        while True:
+            chunk = f.read(chunk_records * RECORD.size)
+            if not chunk:
+                return
+            usable = len(chunk) - len(chunk) % RECORD.size
+            for kind, a, b, check in RECORD.iter_unpack(chunk[:usable]):
+                if check == _check(kind, a, b):
+                    yield offset, kind, a, b
+                offset += RECORD.size
+            if usable < len(chunk):
+                return
+
+
+def open_default_log():
+    # None when the log directory is not writable; the game then just doesn't record
+    try:
+        os.makedirs(default_log_dir(), exist_ok=True)
+        return MatchLog(os.path.join(default_log_dir(), DEFAULT_NAME))
+    except OSError:
+        return None
@@ -0,0 +1,194 @@
+"""Card images at any size, resampled off the Tk thread.
+
+Each card is kept at a few mip levels (LEVELS, as scales of the 120x180
+base) plus whatever exact size the window currently asks for. photo() never
+resamples on the Tk thread: it returns the exact PhotoImage when it is
+ready, otherwise the nearest ready size, and queues the exact one on a
+thread pool (LANCZOS from the full-resolution art). When queued work lands,
+on_ready() is called on the Tk thread so the UI can swap the exact images in.
+
+Memory is bounded: every entry is charged 4 bytes per pixel for the PIL
+copy and again for the Tk copy, and the least recently used entries are
+dropped above max_bytes. The base size and the size on screen are pinned,
+since labels showing them do not keep their own reference.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageTk
+
+BASE_SIZE = (120, 180)
+# Prefetched besides the base size; the UI never draws below it (see ECardApp.apply_window_size)
+LEVELS = (1.5, 2.0, 3.0)
+DEFAULT_MAX_BYTES = 48 << 20
+
+
+def scaled_size(scale):
+    # Sizes step in 12x18 pixels so every size keeps the 2:3 card shape exactly
+    k = max(1, round(scale * 10))
+    return (12 * k, 18 * k)
+
+
+class MipImageCache:
+    def __init__(self, root, base_images, load_source, max_bytes=DEFAULT_MAX_BYTES, workers=2, on_ready=None):
+        # base_images[name] -> PIL image at BASE_SIZE (decoded on demand on the Tk thread, as before);
+        # load_source(name) -> full-resolution PIL image, called on pool threads
+        self.root = root
+        self.base_images = base_images
+        self.load_source = load_source
+        self.max_bytes = max_bytes
+        self.on_ready = on_ready
+        self.active = BASE_SIZE  # size the UI is drawing at; card_images[name] returns this size
+        self.bytes = 0
+        self.hits = 0
+        self.nearest = 0
+        self.generated = 0
+        self.evicted = 0
+        self.generate_seconds = 0.0
+        self._entries = OrderedDict()  # (name, size) -> [PIL image, PhotoImage or None]
+        self._sizes = {}  # name -> set of sizes in _entries
+        self._sources = {}  # name -> full-resolution PIL image
+        self._pending = set()
+        self._done = queue.SimpleQueue()  # (key, PIL image) from the pool
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="card-resample")
+        self._polling = False
+
+    # Tk thread
+
+    def __getitem__(self, name):
+        return self.photo(name, self.active)
+
+    def set_active(self, size):
+        self.active = size
+        self._evict()
+
+    def photo(self, name, size):
+        key = (name, size)
+        entry = self._entries.get(key)
+        if entry is None and size == BASE_SIZE:
+            entry = self._add(key, self.base_images[name])
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._photo(entry)
+        self.request([key])
+        self.nearest += 1
+        # Something is always on hand: the base size decodes synchronously like it always did
+        sizes = self._sizes.get(name) or ()
+        best = min(sizes, key=lambda s: abs(s[1] - size[1]), default=BASE_SIZE)
+        return self.photo(name, best)
+
+    def request(self, keys):
+        # Queue (name, size) keys for background resampling
+        for key in keys:
+            if key in self._entries or key in self._pending:
+                continue
+            self._pending.add(key)
+            self._pool.submit(self._resample, key)
+        if self._pending and not self._polling:
+            self._polling = True
+            self.root.after(15, self._poll)
+
+    def prefetch(self, names, scales=LEVELS):
+        self.request([(name, scaled_size(scale)) for scale in scales for name in names])
+
+    def _poll(self):
+        arrived = False
+        while True:
+            try:
+                key, img = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(key)
+            if img is not None and key not in self._entries:
+                self._add(key, img)
+                arrived = True
+        self._evict()
+        if self._pending:
+            self.root.after(15, self._poll)
+        else:
+            self._polling = False
+        if arrived and self.on_ready:
+            self.on_ready()
+
+    def _add(self, key, img):
+        entry = self._entries[key] = [img, None]
+        self._sizes.setdefault(key[0], set()).add(key[1])
+        self.bytes += _cost(img)
+        return entry
+
+    def _photo(self, entry):
+        if entry[1] is None:
+            entry[1] = ImageTk.PhotoImage(entry[0])
+            self.bytes += _cost(entry[0])
+        return entry[1]
+
+    def _evict(self):
+        if self.bytes <= self.max_bytes:
+            return
+        pinned = (BASE_SIZE, self.active)
+        for key in [k for k in self._entries if k[1] not in pinned]:
+            if self.bytes <= self.max_bytes:
+                break
+            img, photo = self._entries.pop(key)
+            self._sizes[key[0]].discard(key[1])
+            self.bytes -= _cost(img) * (2 if photo is not None else 1)
+            self.evicted += 1
+
+    # Any thread
+
+    def pil(self, name, size):
+        # Exact-size PIL image; resampled on the caller's thread if not cached (used for flip frames)
+        entry = self._entries.get((name, size))
+        if entry is not None:
+            return entry[0]
+        if size == BASE_SIZE:
+            return self.base_images[name]
+        return self._scale(name, size)
+
+    def _scale(self, name, size):
+        with self._lock:
+            source = self._sources.get(name)
+        if source is None:
+            source = self.load_source(name)
+            source.load()
+            with self._lock:
+                self._sources[name] = source
+        start = time.perf_counter()
+        img = source.resize(size, Image.LANCZOS)
+        with self._lock:
+            self.generated += 1
+            self.generate_seconds += time.perf_counter() - start
+        return img
+
+    def _resample(self, key):
+        try:
+            img = self._scale(*key)
+        except Exception:
+            img = None  # missing art: the nearest size stays on screen
+        self._done.put((key, img))
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "active_size": list(self.active),
+            "hits": self.hits,
+            "nearest": self.nearest,
+            "generated": self.generated,
+            "evicted": self.evicted,
+            "pending": len(self._pending),
+            "generate_seconds": self.generate_seconds,
+        }
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _cost(img):
+    return img.size[0] * img.size[1] * 4
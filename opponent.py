@@ -0,0 +1,118 @@
+"""Adaptive CPU that models the human's habits.
+
+For each role the player can take, and each number of Citizens k still in
+their hand, the model counts how often they played their special card.
+That estimate (smoothed toward the equilibrium rate) gives the CPU a best
+response, which is blended with the solved equilibrium from solver.py; the
+blend leans on the model only as evidence accumulates and never fully
+abandons the safe baseline.
+
+observe() and cpu_card() are O(1) with a handful of float operations, so
+the same object can run inside the GUI, the server or a tournament.
+"""
+import json
+import os
+import random
+
+import engine
+import solver
+
+PRIOR = 8.0  # pseudo-observations at the equilibrium rate
+MAX_WEIGHT = 0.75  # share of the decision the model can ever take over
+WEIGHT_HALF = 20.0  # observations at which the model gets half of MAX_WEIGHT
+DEFAULT_NAME = "opponent.json"
+
+
+def model_name(hand_size=engine.HAND_SIZE):
+    # One file per hand size, so a game at another size never overwrites what was learned
+    return DEFAULT_NAME if hand_size == engine.HAND_SIZE else f"opponent-{hand_size}.json"
+
+
+def _valid_counts(counts, hand_size):
+    # Both roles, each with hand_size [special played, decisions seen] cells of ints
+    return (isinstance(counts, dict) and all(
+        isinstance(counts.get(role), list) and len(counts[role]) == hand_size
+        and all(isinstance(cell, list) and len(cell) == 2
+                and all(type(n) is int and n >= 0 for n in cell) for cell in counts[role])
+        for role in engine.ROLES))
+
+
+class OpponentModel:
+    def __init__(self, hand_size=engine.HAND_SIZE, counts=None, baseline=None):
+        # baseline: solver.StrategyTable for this hand size (solved here if not given)
+        baseline = baseline or solver.StrategyTable.solved(hand_size)
+        self.hand_size = hand_size
+        # Equilibrium rates and P(Emperor side wins) by Citizens left
+        self.eq_emperor = baseline.special["Emperor"]
+        self.eq_slave = baseline.special["Slave"]
+        self.value = baseline.emperor_value
+        # counts[role][k] = [special played, decisions seen] for the human in that role
+        self.counts = counts or {role: [[0, 0] for _ in range(hand_size)] for role in engine.ROLES}
+
+    def observe(self, state, player_card):
+        """Record the human's card; state is the match state before the round."""
+        citizens, special = engine.counts(state)[:2]
+        if not citizens or not special:
+            return  # forced move, nothing learned
+        cell = self.counts[engine.player_role(state)][citizens]
+        cell[0] += player_card != engine.CITIZEN
+        cell[1] += 1
+
+    def predict(self, role, citizens):
+        # Smoothed P(human plays their special card)
+        eq = (self.eq_emperor if role == "Emperor" else self.eq_slave)[citizens]
+        special, seen = self.counts[role][citizens]
+        return (special + PRIOR * eq) / (seen + PRIOR), seen
+
+    def special_probability(self, state):
+        # Probability the CPU plays its special card in this state
+        _, _, citizens, special = engine.counts(state)
+        if not special:
+            return 0.0
+        if not citizens:
+            return 1.0
+        player = engine.player_role(state)
+        p, seen = self.predict(player, citizens)
+        cont = self.value[citizens - 1]
+        if player == "Slave":
+            # CPU is the Emperor: its Emperor wins unless it meets the Slave
+            special_value = 1 - p
+            citizen_value = p + (1 - p) * cont
+            eq = self.eq_emperor[citizens]
+        else:
+            # CPU is the Slave: Slave only wins by meeting the Emperor
+            special_value = p
+            citizen_value = (1 - p) * (1 - cont)
+            eq = self.eq_slave[citizens]
+        best = 1.0 if special_value > citizen_value else 0.0
+        weight = MAX_WEIGHT * seen / (seen + WEIGHT_HALF)
+        return (1 - weight) * eq + weight * best
+
+    def cpu_card(self, state, rng=random):
+        if rng.random() < self.special_probability(state):
+            return engine.special_card(engine.cpu_role(state))
+        return engine.CITIZEN
+
+    def to_dict(self):
+        return {"version": 1, "hand_size": self.hand_size, "counts": self.counts}
+
+    @classmethod
+    def load(cls, path, hand_size=engine.HAND_SIZE, baseline=None):
+        # A missing, corrupt or differently-sized file starts a fresh model
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data["hand_size"] == hand_size and _valid_counts(data["counts"], hand_size):
+                return cls(hand_size, data["counts"], baseline)
+        except (OSError, KeyError, TypeError, ValueError):
+            pass
+        return cls(hand_size, baseline=baseline)
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.to_dict(), f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
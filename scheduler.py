@@ -0,0 +1,177 @@
+"""One tick-driven scheduler for every animation and timer in the GUI.
+
+Instead of each flip chaining its own root.after() calls, ECardApp owns a
+FrameScheduler that wakes up on a single Tk timer, advances every active
+animation and fires every due timer in the same tick. Animations pick their
+frame from the elapsed wall time, so when a tick arrives late the missed
+frames are dropped rather than queued and nothing drifts.
+
+speed > 1 runs every delay and animation that many times faster (soak
+tests drive the real GUI this way); the tick interval itself is unchanged.
+With a VirtualClock nothing waits on Tk at all: drain() jumps the clock
+from one due timer or animation frame to the next, so a whole round with
+its flips and banners runs as fast as the UI updates allow.
+"""
+import heapq
+import itertools
+import time
+from collections import deque
+
+
+class Animation:
+    def __init__(self, frame_count, frame_s, on_frame, on_done, start):
+        self.frame_count = frame_count
+        self.frame_s = frame_s
+        self.on_frame = on_frame
+        self.on_done = on_done
+        self.start = start
+        self.shown = -1
+        self.displayed = 0
+
+    def advance(self, now):
+        # Returns (finished, frames dropped)
+        idx = int((now - self.start) / self.frame_s)
+        if idx >= self.frame_count:
+            return True, self.frame_count - 1 - self.shown
+        if idx == self.shown:
+            return False, 0
+        dropped = max(0, idx - self.shown - 1)
+        self.shown = idx
+        self.displayed += 1
+        self.on_frame(idx)
+        return False, dropped
+
+
+class VirtualClock:
+    # Stand-in for time.perf_counter that only moves when the scheduler jumps it
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+class FrameScheduler:
+    def __init__(self, root, frame_ms=16, history=600, speed=1.0, clock=None):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.speed = speed
+        self.clock = clock or time.perf_counter
+        self.virtual = isinstance(clock, VirtualClock)
+        self._animations = []
+        self._timers = []  # heap of [due, seq, callback]; callback None when cancelled
+        self._seq = itertools.count()
+        self._after_id = None
+        self._next_wake = None
+        self._in_tick = False
+        self._last_tick = None
+        self.frame_times = deque(maxlen=history)  # seconds between ticks while animating
+        self.frames_shown = 0
+        self.frames_dropped = 0
+
+    def animate(self, frame_count, on_frame, frame_ms=30, on_done=None):
+        # on_frame(idx) runs for each frame actually shown, on_done() once after the last
+        anim = Animation(frame_count, frame_ms / 1000 / self.speed, on_frame, on_done, self.clock())
+        self._animations.append(anim)
+        self._wake(0)
+        return anim
+
+    def call_later(self, delay_ms, callback):
+        delay_ms /= self.speed
+        entry = [self.clock() + delay_ms / 1000, next(self._seq), callback]
+        heapq.heappush(self._timers, entry)
+        self._wake(delay_ms)
+        return entry
+
+    def cancel(self, token):
+        if isinstance(token, Animation):
+            if token in self._animations:
+                self._animations.remove(token)
+        else:
+            token[2] = None
+
+    def idle(self):
+        # Nothing animating and no live timer pending
+        return not self._animations and not any(entry[2] for entry in self._timers)
+
+    def cancel_all(self):
+        self._animations = []
+        self._timers = []
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = None
+        self._next_wake = None
+        self._last_tick = None
+
+    def drain(self, max_ticks=100_000):
+        # Virtual clock only: jump from event to event until nothing is pending; returns ticks run
+        ticks = 0
+        while ticks < max_ticks:
+            while self._timers and self._timers[0][2] is None:
+                heapq.heappop(self._timers)
+            due = [self._timers[0][0]] if self._timers else []
+            # Next frame of each animation; the nudge keeps float error from landing just short of it
+            due.extend(a.start + (a.shown + 1) * a.frame_s + 1e-9 for a in self._animations)
+            if not due:
+                break
+            self.clock.now = max(self.clock.now, min(due))
+            self._tick()
+            ticks += 1
+        return ticks
+
+    def _wake(self, delay_ms):
+        if self._in_tick or self.virtual:
+            return  # _tick reschedules itself once it is done; drain() drives a virtual clock
+        due = self.clock() + delay_ms / 1000
+        if self._after_id is not None:
+            if self._next_wake <= due:
+                return
+            self.root.after_cancel(self._after_id)
+        self._next_wake = due
+        self._after_id = self.root.after(max(0, int(delay_ms)), self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self._in_tick = True
+        now = self.clock()
+        if self._last_tick is not None:
+            self.frame_times.append(now - self._last_tick)
+        self._last_tick = now
+        try:
+            while self._timers and self._timers[0][0] <= now:
+                callback = heapq.heappop(self._timers)[2]
+                if callback is not None:
+                    callback()
+            for anim in list(self._animations):
+                if anim not in self._animations:
+                    continue  # cancelled by a callback earlier in this tick
+                finished, dropped = anim.advance(now)
+                self.frames_dropped += dropped
+                if finished:
+                    self._animations.remove(anim)
+                    self.frames_shown += anim.displayed
+                    if anim.on_done:
+                        anim.on_done()
+        finally:
+            self._in_tick = False
+        while self._timers and self._timers[0][2] is None:
+            heapq.heappop(self._timers)
+        if self._animations:
+            self._wake(self.frame_ms)
+        else:
+            self._last_tick = None  # no frames to draw: don't count the gap as a frame time
+            if self._timers:
+                self._wake((self._timers[0][0] - self.clock()) * 1000)
+
+    def stats(self):
+        times = sorted(self.frame_times)
+        if not times:
+            return {"ticks": 0, "frames_shown": self.frames_shown, "frames_dropped": self.frames_dropped}
+        return {
+            "ticks": len(times),
+            "mean_ms": sum(times) / len(times) * 1000,
+            "p95_ms": times[int(len(times) * 0.95)] * 1000,
+            "max_ms": times[-1] * 1000,
+            "frames_shown": self.frames_shown,
+            "frames_dropped": self.frames_dropped,
+        }
@@ -0,0 +1,192 @@
+"""asyncio E-Card server: one table (match) per connection, thousands at once.
+
+Rules come from engine.py and the CPU from the solved strategy table (or,
+with --cpu adaptive, a per-connection opponent.OpponentModel), the same ones
+ECardGame uses. Every game message is 4 bytes:
+
+    client -> server
+        NEW     [1, role, hand_size, 0]     role 0 = Emperor, 1 = Slave
+        PLAY    [2, card, 0, 0]             engine card code (0 Citizen, 1 Emperor, 2 Slave)
+        STATS   [3, 0, 0, 0]
+    server -> client
+        STARTED [0x81, role, hand_size, 0]
+        RESULT  [0x82, cpu_card, outcome | over << 2, player cards left]
+        STATS   [0x83, length (3 bytes, big endian)] + JSON
+        ERROR   [0xFF, code, 0, 0]
+
+    python server.py --port 7450
+    python server.py --unix /tmp/ecard.sock --trace-memory
+"""
+import argparse
+import asyncio
+import json
+import random
+import struct
+import time
+import tracemalloc
+from collections import deque
+
+import engine
+import opponent
+import solver
+
+MSG = struct.Struct("4B")
+NEW, PLAY, STATS = 1, 2, 3
+STARTED, RESULT, STATS_REPLY, ERROR = 0x81, 0x82, 0x83, 0xFF
+ERR_NO_MATCH, ERR_BAD_CARD, ERR_BAD_MESSAGE = 1, 2, 3
+ROLES = ("Emperor", "Slave")
+
+DEFAULT_PORT = 7450
+
+
+class Table:
+    __slots__ = ("state", "strategy", "model")
+
+    def __init__(self):
+        self.state = None
+        self.strategy = None
+        self.model = None  # per-connection OpponentModel with --cpu adaptive
+
+
+class GameServer:
+    def __init__(self, seed=None, trace_memory=False, cpu="equilibrium"):
+        self.rng = random.Random(seed)
+        self.cpu = cpu
+        self.strategies = {}  # hand_size -> solver.StrategyTable
+        self.connections = 0
+        self.rounds = 0
+        self.matches = 0
+        self.round_times = deque(maxlen=100_000)  # server-side seconds per PLAY
+        self.started = time.perf_counter()
+        self.trace_memory = trace_memory
+        self._memory_baseline = 0
+        self._memory_peak = (0, 0)  # (connections, traced bytes) at the busiest sample
+        if trace_memory:
+            tracemalloc.start()
+            self._memory_baseline = tracemalloc.get_traced_memory()[0]
+
+    def strategy(self, hand_size):
+        table = self.strategies.get(hand_size)
+        if table is None:
+            table = self.strategies[hand_size] = solver.StrategyTable.solved(hand_size)
+        return table
+
+    def handle(self, table, kind, a, b):
+        # One request -> reply bytes; no I/O here so it can be driven directly
+        if kind == PLAY:
+            if table.state is None:
+                return MSG.pack(ERROR, ERR_NO_MATCH, 0, 0)
+            if a > engine.SLAVE:
+                return MSG.pack(ERROR, ERR_BAD_CARD, 0, 0)
+            start = time.perf_counter()
+            cpu_card = table.strategy.cpu_card(table.state, self.rng)
+            before = table.state
+            try:
+                table.state, outcome = engine.step(table.state, a, cpu_card)
+            except ValueError:
+                return MSG.pack(ERROR, ERR_BAD_CARD, 0, 0)
+            if table.model is not None:
+                table.model.observe(before, a)
+            over = engine.is_over(table.state)
+            self.rounds += 1
+            if over:
+                self.matches += 1
+                left = 0
+            else:
+                left = engine.cards_left(table.state)
+            self.round_times.append(time.perf_counter() - start)
+            if over:
+                table.state = None
+            return MSG.pack(RESULT, cpu_card, outcome | over << 2, left)
+        if kind == NEW:
+            if a > 1 or not 1 <= b <= engine.MAX_CITIZENS + 1:
+                return MSG.pack(ERROR, ERR_BAD_MESSAGE, 0, 0)
+            table.state = engine.new_match(ROLES[a], b)
+            table.strategy = self.strategy(b)
+            if self.cpu == "adaptive":
+                # The model follows the client from match to match on this connection
+                if table.model is None or table.model.hand_size != b:
+                    table.model = opponent.OpponentModel(b, baseline=table.strategy)
+                table.strategy = table.model
+            if self.trace_memory and self.connections >= self._memory_peak[0]:
+                self._memory_peak = (self.connections, tracemalloc.get_traced_memory()[0])
+            return MSG.pack(STARTED, a, b, 0)
+        if kind == STATS:
+            payload = json.dumps(self.stats()).encode()
+            return bytes([STATS_REPLY]) + len(payload).to_bytes(3, "big") + payload
+        return MSG.pack(ERROR, ERR_BAD_MESSAGE, 0, 0)
+
+    async def serve_client(self, reader, writer):
+        self.connections += 1
+        table = Table()
+        try:
+            while True:
+                try:
+                    kind, a, b, _ = MSG.unpack(await reader.readexactly(MSG.size))
+                except asyncio.IncompleteReadError:
+                    break
+                writer.write(self.handle(table, kind, a, b))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started
+        times = sorted(self.round_times)
+        result = {
+            "connections": self.connections,
+            "rounds": self.rounds,
+            "matches": self.matches,
+            "matches_per_sec": self.matches / elapsed if elapsed else 0.0,
+        }
+        if times:
+            result["round_p50_us"] = times[len(times) // 2] * 1e6
+            result["round_p99_us"] = times[int(len(times) * 0.99)] * 1e6
+        if self.trace_memory and self._memory_peak[0]:
+            connections, traced = self._memory_peak
+            result["peak_connections"] = connections
+            result["bytes_per_connection"] = (traced - self._memory_baseline) / connections
+        return result
+
+
+async def start_server(game, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None, backlog=4096):
+    # A deep backlog so a burst of thousands of connects is not refused
+    if unix_path:
+        return await asyncio.start_unix_server(game.serve_client, unix_path, backlog=backlog)
+    return await asyncio.start_server(game.serve_client, host, port, backlog=backlog)
+
+
+async def _main(args):
+    game = GameServer(args.seed, args.trace_memory, args.cpu)
+    server = await start_server(game, args.host, args.port, args.unix)
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"E-Card server on {where}")
+    async with server:
+        if not args.report_every:
+            await server.serve_forever()
+        while True:
+            await asyncio.sleep(args.report_every)
+            print(json.dumps(game.stats()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="asyncio multi-table E-Card server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--cpu", choices=("equilibrium", "adaptive"), default="equilibrium")
+    parser.add_argument("--trace-memory", action="store_true", help="report bytes per connection (slower)")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between stats lines")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Vectorized Monte Carlo simulator for whole batches of E-Card matches.
+
+Every match in a batch is a row in a handful of NumPy arrays (Citizens left
+and special card held, per side). Each round both policies choose a card for
+all still-running matches at once and the outcome is read from PAYOFF, the
+array form of engine.OUTCOMES.
+
+A policy is any callable ``policy(citizens, special, round_idx, rng)`` that
+returns a bool array: True where that side plays its special card. The
+simulator clamps the choice to what is actually in hand.
+
+    python simulator.py -n 10000000 --player uniform --cpu uniform
+"""
+import argparse
+import time
+
+import numpy as np
+
+import engine
+
+# PAYOFF[player_card, cpu_card] -> engine.DRAW / PLAYER / CPU
+PAYOFF = np.frombuffer(engine.OUTCOMES, dtype=np.uint8).reshape(3, 3)
+
+DEFAULT_CHUNK = 1 << 20
+
+
+def uniform_policy(citizens, special, round_idx, rng):
+    # Same distribution as random.choice over the hand
+    return rng.random(citizens.shape[0]) * (citizens + special) < special
+
+
+def special_first_policy(citizens, special, round_idx, rng):
+    return np.ones(citizens.shape[0], dtype=bool)
+
+
+def special_last_policy(citizens, special, round_idx, rng):
+    return np.zeros(citizens.shape[0], dtype=bool)
+
+
+POLICIES = {
+    "uniform": uniform_policy,
+    "special-first": special_first_policy,
+    "special-last": special_last_policy,
+}
+
+
+def _choose(policy, citizens, special, special_code, round_idx, rng):
+    plays_special = policy(citizens, special, round_idx, rng)
+    plays_special = (plays_special & special) | (citizens == 0)
+    return np.where(plays_special, special_code, engine.CITIZEN).astype(np.uint8)
+
+
+def _simulate_chunk(n, role, player_policy, cpu_policy, hand_size, rng):
+    # Returns (outcome counts [draw, player, cpu], rounds histogram)
+    citizens = hand_size - 1
+    p_cit = np.full(n, citizens, dtype=np.int16)
+    c_cit = np.full(n, citizens, dtype=np.int16)
+    p_sp = np.ones(n, dtype=bool)
+    c_sp = np.ones(n, dtype=bool)
+    p_code = engine.special_card(role)
+    c_code = engine.special_card(engine.other_role(role))
+
+    outcome_counts = np.zeros(3, dtype=np.int64)
+    rounds_hist = np.zeros(hand_size + 1, dtype=np.int64)
+    for round_idx in range(hand_size):
+        if not p_cit.shape[0]:
+            break
+        p_card = _choose(player_policy, p_cit, p_sp, p_code, round_idx, rng)
+        c_card = _choose(cpu_policy, c_cit, c_sp, c_code, round_idx, rng)
+        p_played = p_card != engine.CITIZEN
+        c_played = c_card != engine.CITIZEN
+        p_cit -= ~p_played
+        c_cit -= ~c_played
+        p_sp &= ~p_played
+        c_sp &= ~c_played
+
+        outcome = PAYOFF[p_card, c_card]
+        done = (outcome != engine.DRAW) | ((p_cit == 0) & ~p_sp)
+        outcome_counts += np.bincount(outcome[done], minlength=3)
+        rounds_hist[round_idx + 1] += np.count_nonzero(done)
+
+        keep = ~done
+        p_cit, c_cit, p_sp, c_sp = p_cit[keep], c_cit[keep], p_sp[keep], c_sp[keep]
+    return outcome_counts, rounds_hist
+
+
+def simulate(n, player_policy=uniform_policy, cpu_policy=uniform_policy,
+             hand_size=engine.HAND_SIZE, roles=engine.ROLES, seed=None, chunk_size=DEFAULT_CHUNK):
+    """Play n matches per player role and return a result dict per role."""
+    rng = np.random.default_rng(seed)
+    results = {}
+    for role in roles:
+        outcome_counts = np.zeros(3, dtype=np.int64)
+        rounds_hist = np.zeros(hand_size + 1, dtype=np.int64)
+        start = time.perf_counter()
+        remaining = n
+        while remaining:
+            size = min(remaining, chunk_size)
+            counts, hist = _simulate_chunk(size, role, player_policy, cpu_policy, hand_size, rng)
+            outcome_counts += counts
+            rounds_hist += hist
+            remaining -= size
+        elapsed = time.perf_counter() - start
+        results[role] = {
+            "matches": n,
+            "player_win": outcome_counts[engine.PLAYER] / n,
+            "cpu_win": outcome_counts[engine.CPU] / n,
+            "draw": outcome_counts[engine.DRAW] / n,
+            # rounds_hist[k] = matches that ended after exactly k rounds
+            "rounds_hist": rounds_hist.tolist(),
+            "seconds": elapsed,
+            "matches_per_sec": n / elapsed if elapsed else float("inf"),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch E-Card Monte Carlo simulator")
+    parser.add_argument("-n", "--matches", type=int, default=1_000_000, help="matches per player role")
+    parser.add_argument("--player", choices=sorted(POLICIES), default="uniform")
+    parser.add_argument("--cpu", choices=sorted(POLICIES), default="uniform")
+    parser.add_argument("--hand-size", type=int, default=engine.HAND_SIZE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    args = parser.parse_args(argv)
+
+    results = simulate(args.matches, POLICIES[args.player], POLICIES[args.cpu],
+                       args.hand_size, seed=args.seed, chunk_size=args.chunk_size)
+    for role, r in results.items():
+        print(f"Player as {role}: win {r['player_win']:.4f}  lose {r['cpu_win']:.4f}  "
+              f"draw {r['draw']:.4f}  ({r['matches_per_sec']:,.0f} matches/s)")
+        print("  ended after round: " + "  ".join(
+            f"{k}:{count / r['matches']:.4f}" for k, count in enumerate(r["rounds_hist"]) if k))
+
+
+if __name__ == "__main__":
+    main()
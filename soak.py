@@ -0,0 +1,158 @@
+"""Soak test: auto-play thousands of matches through the real GUI and watch memory.
+
+The driver clicks cards, Play Again, Change Role and the sound panel the way
+a kiosk visitor would, with the app's scheduler sped up so a match takes
+milliseconds. After a warm-up it samples, at the start of each sampled
+game, traced Python memory (tracemalloc), RSS, live Tk images and live
+widgets, and exits non-zero if any of them grew past its limit.
+
+Runs unattended through harness.py (silent audio, temporary match log;
+needs a display).
+
+    python soak.py --matches 5000 --renderer canvas --json soak.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tkinter as tk
+import tracemalloc
+
+import harness  # before ecarddemo: silent audio and a temporary match log
+import engine
+import ecarddemo
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def sample(root, matches):
+    return {
+        "matches": matches,
+        "traced_bytes": tracemalloc.get_traced_memory()[0],
+        "rss_bytes": rss_bytes(),
+        "tk_images": len(root.tk.call("image", "names")),
+        "widgets": harness.live_widgets(root),
+    }
+
+
+class SoakDriver:
+    def __init__(self, root, app, args):
+        self.root = root
+        self.app = app
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.matches = 0
+        self.samples = []
+        self.baseline = None
+        self.failures = []
+
+    def start(self):
+        self.app.start_game(engine.ROLES[0])
+        self.root.after(1, self.step)
+
+    def step(self):
+        game = self.app.game
+        if game.game_over:
+            self.matches += 1
+            if self.matches >= self.args.matches:
+                self.finish()
+                return
+            self.next_game(game)
+            if self.matches >= self.args.warmup and self.matches % self.args.sample_every == 0:
+                self.take_sample()
+        elif self.app.scheduler.idle():
+            game.play_round(self.rng.choice(game.player_hand))
+        self.root.after(1, self.step)
+
+    def next_game(self, game):
+        if self.matches % self.args.panel_every == 0:
+            # Open and close the settings panel like a visitor fiddling with the volume
+            self.app.open_sound_panel()
+            self.app.sound_panel.withdraw()
+        if self.matches % self.args.role_every == 0:
+            game.change_role()
+            self.app.start_game(engine.other_role(game.role), self.app.player_score, self.app.cpu_score)
+        else:
+            game.play_again()
+
+    def take_sample(self):
+        s = sample(self.root, self.matches)
+        self.samples.append(s)
+        if self.args.verbose:
+            print(json.dumps(s), file=sys.stderr)
+        if self.baseline is None:
+            self.baseline = s
+            return
+        base = self.baseline
+        if s["traced_bytes"] - base["traced_bytes"] > self.args.max_growth_mb * 1e6:
+            self.failures.append(f"traced memory grew {(s['traced_bytes'] - base['traced_bytes']) / 1e6:.2f} MB "
+                                 f"by match {self.matches}")
+        if s["rss_bytes"] and base["rss_bytes"] and s["rss_bytes"] - base["rss_bytes"] > self.args.max_rss_growth_mb * 1e6:
+            self.failures.append(f"RSS grew {(s['rss_bytes'] - base['rss_bytes']) / 1e6:.2f} MB by match {self.matches}")
+        for key in ("tk_images", "widgets"):
+            if s[key] > base[key]:
+                self.failures.append(f"{key} went from {base[key]} to {s[key]} by match {self.matches}")
+
+    def finish(self):
+        self.root.quit()
+
+    def result(self):
+        return {
+            "matches": self.matches,
+            "renderer": self.args.renderer,
+            "baseline": self.baseline,
+            "final": self.samples[-1] if self.samples else None,
+            "samples": self.samples,
+            "failures": self.failures,
+            "passed": not self.failures,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auto-play the GUI and fail on memory growth")
+    parser.add_argument("--matches", type=int, default=2000)
+    parser.add_argument("--renderer", choices=("widgets", "canvas"), default="widgets")
+    parser.add_argument("--speed", type=float, default=200.0, help="scheduler speed-up (1 = real time)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=50, help="matches before the baseline sample")
+    parser.add_argument("--sample-every", type=int, default=50)
+    parser.add_argument("--role-every", type=int, default=10, help="change role every N matches")
+    parser.add_argument("--panel-every", type=int, default=25, help="open the sound panel every N matches")
+    parser.add_argument("--max-growth-mb", type=float, default=2.0, help="allowed tracemalloc growth")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=20.0)
+    parser.add_argument("--json", help="write the samples and verdict here")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print each sample on stderr")
+    args = parser.parse_args(argv)
+
+    tracemalloc.start()
+    root = tk.Tk()
+    app = ecarddemo.ECardApp(root, renderer=args.renderer)
+    app.scheduler.speed = args.speed
+    driver = SoakDriver(root, app, args)
+    driver.start()
+    root.mainloop()
+    result = driver.result()
+    result["scheduler"] = app.scheduler.stats()
+    harness.close_app(app)
+    root.destroy()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    for failure in result["failures"]:
+        print("FAIL:", failure, file=sys.stderr)
+    final = result["final"] or {}
+    print(f"{result['matches']} matches, {'passed' if result['passed'] else 'FAILED'}; "
+          f"traced {final.get('traced_bytes', 0) / 1e6:.2f} MB, {final.get('tk_images')} Tk images, "
+          f"{final.get('widgets')} widgets; {result['scheduler']['frames_dropped']} frames dropped")
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
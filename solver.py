@@ -0,0 +1,146 @@
+"""Exact equilibrium solver for the E-Card CPU opponent.
+
+While a match is running both sides still hold their special card and the
+same number of Citizens k (any special played ends the match), so a state is
+just k. Each state is a 2x2 zero-sum game, Emperor {Emperor, Citizen} vs
+Slave {Slave, Citizen}, whose Citizen/Citizen cell is the value of state
+k - 1. Backward induction from k = 0 solves every state exactly with Fractions.
+
+The table is written to JSON and loaded by ECardApp at startup, so the CPU
+draws its card from a precomputed probability in O(1):
+
+    python solver.py --max-hand 5 -o strategy.json
+    python solver.py --report 5 50 256
+"""
+import argparse
+import json
+import os
+import random
+import time
+from fractions import Fraction
+from functools import lru_cache
+
+import engine
+
+DEFAULT_TABLE = "strategy.json"
+
+
+def solve_2x2(a, b, c, d):
+    """Solve the row player's (maximizer) 2x2 zero-sum game [[a, b], [c, d]].
+
+    Returns (p_row0, q_col0, value)."""
+    # Pure saddle point: a cell that is the min of its row and the max of its column
+    for i, row in enumerate(((a, b), (c, d))):
+        for j, cell in enumerate(row):
+            col = (a, c) if j == 0 else (b, d)
+            if cell == min(row) and cell == max(col):
+                return Fraction(1 - i), Fraction(1 - j), cell
+    den = a - b - c + d
+    p = (d - c) / den
+    q = (d - b) / den
+    return p, q, (a * d - b * c) / den
+
+
+@lru_cache(maxsize=None)
+def solve_state(citizens):
+    """Equilibrium for k Citizens each: (p Emperor plays special, p Slave plays special, P(Emperor wins))."""
+    if citizens == 0:
+        # Only the specials are left and the Slave takes the Emperor
+        return Fraction(1), Fraction(1), Fraction(0)
+    continue_value = solve_state(citizens - 1)[2]
+    # Rows: Emperor plays Emperor / Citizen. Columns: Slave plays Slave / Citizen.
+    # Payoff is the Emperor's probability of winning the match.
+    return solve_2x2(Fraction(0), Fraction(1), Fraction(1), continue_value)
+
+
+def solve(hand_size):
+    """Return the table for one hand size as a list indexed by Citizens left."""
+    return [solve_state(k) for k in range(hand_size)]
+
+
+def build_tables(hand_sizes):
+    tables = {}
+    for hand_size in hand_sizes:
+        table = solve(hand_size)
+        tables[str(hand_size)] = {
+            "emperor_special": [float(p) for p, _, _ in table],
+            "slave_special": [float(q) for _, q, _ in table],
+            "emperor_value": [float(v) for _, _, v in table],
+        }
+    return {"version": 1, "tables": tables}
+
+
+def save_tables(path, hand_sizes):
+    with open(path, "w") as f:
+        json.dump(build_tables(hand_sizes), f)
+
+
+class StrategyTable:
+    # Per-role lists of "probability of playing the special card", indexed by Citizens left
+
+    def __init__(self, emperor_special, slave_special, emperor_value):
+        self.special = {"Emperor": emperor_special, "Slave": slave_special}
+        self.emperor_value = emperor_value  # P(Emperor side wins) with both sides in equilibrium
+
+    @classmethod
+    def solved(cls, hand_size=engine.HAND_SIZE):
+        table = solve(hand_size)
+        return cls([float(p) for p, _, _ in table], [float(q) for _, q, _ in table],
+                   [float(v) for _, _, v in table])
+
+    @classmethod
+    def load(cls, path, hand_size=engine.HAND_SIZE):
+        # Fall back to solving in place if the file is missing or lacks this hand size
+        try:
+            with open(path) as f:
+                data = json.load(f)["tables"][str(hand_size)]
+            return cls(data["emperor_special"], data["slave_special"], data["emperor_value"])
+        except (OSError, KeyError, ValueError):
+            return cls.solved(hand_size)
+
+    def cpu_card(self, state, rng=random):
+        role = engine.cpu_role(state)
+        _, _, citizens, special = engine.counts(state)
+        if special and (not citizens or rng.random() < self.special[role][citizens]):
+            return engine.special_card(role)
+        return engine.CITIZEN
+
+    def numpy_policy(self, role):
+        # Adapter for simulator.simulate()
+        import numpy as np
+        probs = np.asarray(self.special[role])
+
+        def policy(citizens, special, round_idx, rng):
+            return rng.random(citizens.shape[0]) < probs[citizens]
+        return policy
+
+
+def report(hand_sizes):
+    for hand_size in hand_sizes:
+        solve_state.cache_clear()
+        start = time.perf_counter()
+        tables = build_tables([hand_size])
+        elapsed = time.perf_counter() - start
+        size = len(json.dumps(tables))
+        value = tables["tables"][str(hand_size)]["emperor_value"][-1]
+        print(f"hand {hand_size:>4}: {hand_size} states solved in {elapsed * 1000:.2f} ms, "
+              f"table {size:,} bytes, P(Emperor wins) = {value:.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve the E-Card equilibrium strategy table")
+    parser.add_argument("--max-hand", type=int, default=engine.HAND_SIZE,
+                        help="write tables for every hand size up to this one")
+    parser.add_argument("-o", "--output", default=DEFAULT_TABLE)
+    parser.add_argument("--report", type=int, nargs="*", metavar="HAND",
+                        help="print solve time and table size for these hand sizes instead")
+    args = parser.parse_args(argv)
+    if args.report is not None:
+        report(args.report or [5, 10, 50, 100, engine.MAX_CITIZENS + 1])
+        return
+    save_tables(args.output, range(1, args.max_hand + 1))
+    print(f"Wrote {args.output} ({os.path.getsize(args.output):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
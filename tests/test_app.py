@@ -0,0 +1,37 @@
+import tkinter as tk
+
+import pytest
+
+import harness  # noqa: F401  (before ecarddemo: silent audio)
+import ecarddemo
+import engine
+import guidriver
+from scheduler import VirtualClock
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Needs a display (xvfb-run on a headless machine)
+    monkeypatch.setenv("ECARD_LOG_DIR", str(tmp_path))
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f"no display: {e}")
+    app = ecarddemo.ECardApp(root, seed=0, clock=VirtualClock())
+    root.update()
+    yield app
+    harness.close_app(app)
+    root.destroy()
+
+
+def test_round_at_another_hand_size_reloads_the_cpu(app):
+    assert app.cpu_policy.hand_size == engine.HAND_SIZE
+    app.hand_size = 7
+    driver = guidriver.GuiDriver(app.root, app)
+    for role in engine.ROLES:
+        # Opening with a Citizen leaves 6 Citizens in the model's lookups, past a 5-card model
+        driver.apply(["role", role])
+        driver.apply(["card", "Citizen"])
+    assert driver.rounds == 2 and not driver.skipped
+    assert app.cpu_policy.hand_size == 7
+    assert app.kaiji_tables["Emperor"].hand_size == 7
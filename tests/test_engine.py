@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+import engine
+
+
+def test_new_match_deals_full_hands():
+    state = engine.new_match("Emperor")
+    assert engine.player_hand(state) == ["Emperor"] + ["Citizen"] * 4
+    assert engine.cpu_hand(state) == ["Slave"] + ["Citizen"] * 4
+    assert engine.counts(state) == (4, True, 4, True)
+    assert engine.player_role(state) == "Emperor"
+    assert engine.cpu_role(state) == "Slave"
+    assert not engine.is_over(state)
+
+
+def test_new_match_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        engine.new_match("King")
+    with pytest.raises(ValueError):
+        engine.new_match("Emperor", hand_size=0)
+    with pytest.raises(ValueError):
+        engine.new_match("Emperor", hand_size=engine.MAX_CITIZENS + 2)
+
+
+@pytest.mark.parametrize("player, cpu, outcome", [
+    (engine.EMPEROR, engine.CITIZEN, engine.PLAYER),
+    (engine.CITIZEN, engine.SLAVE, engine.PLAYER),
+    (engine.SLAVE, engine.EMPEROR, engine.PLAYER),
+    (engine.CITIZEN, engine.EMPEROR, engine.CPU),
+    (engine.SLAVE, engine.CITIZEN, engine.CPU),
+    (engine.EMPEROR, engine.SLAVE, engine.CPU),
+    (engine.CITIZEN, engine.CITIZEN, engine.DRAW),
+])
+def test_resolve(player, cpu, outcome):
+    assert engine.resolve(player, cpu) == outcome
+
+
+def test_citizen_draw_continues_and_special_ends():
+    state, outcome = engine.play(engine.new_match("Slave"), engine.CITIZEN, engine.CITIZEN)
+    assert outcome == engine.DRAW
+    assert engine.counts(state) == (3, True, 3, True)
+    assert not engine.is_over(state)
+    state, outcome = engine.play(state, engine.SLAVE, engine.EMPEROR)
+    assert outcome == engine.PLAYER
+    assert engine.is_over(state)
+
+
+def test_play_rejects_illegal_cards():
+    state = engine.new_match("Emperor")
+    with pytest.raises(ValueError):
+        engine.play(state, engine.SLAVE, engine.CITIZEN)
+    with pytest.raises(ValueError):
+        engine.play(state, engine.CITIZEN, engine.EMPEROR)
+    over, _ = engine.step(state, engine.EMPEROR, engine.CITIZEN)
+    with pytest.raises(ValueError, match="already over"):
+        engine.step(over, engine.CITIZEN, engine.CITIZEN)
+
+
+def test_step_matches_play():
+    rng = random.Random(3)
+    for _ in range(200):
+        state = engine.new_match(rng.choice(engine.ROLES), rng.randint(1, 8))
+        while not engine.is_over(state):
+            player = engine.random_player_card(state, rng)
+            cpu = engine.random_cpu_card(state, rng)
+            expected = engine.play(state, player, cpu)
+            assert engine.step(state, player, cpu) == expected
+            state = expected[0]
+
+
+def test_swap_sides_mirrors_the_position():
+    state, _ = engine.play(engine.new_match("Emperor", 6), engine.CITIZEN, engine.CITIZEN)
+    swapped = engine.swap_sides(state)
+    assert engine.player_role(swapped) == "Slave"
+    assert engine.player_hand(swapped) == engine.cpu_hand(state)
+    assert engine.cpu_hand(swapped) == engine.player_hand(state)
+    assert engine.swap_sides(swapped) == state
+
+
+def test_random_matches_never_draw():
+    # Both sides always hold the same number of Citizens, so someone plays a special before the end
+    rng = random.Random(0)
+    for i in range(2000):
+        outcome, rounds = engine.play_random_match(engine.ROLES[i & 1], rng=rng)
+        assert outcome in (engine.PLAYER, engine.CPU)
+        assert 1 <= rounds <= engine.HAND_SIZE
+
+
+def test_kaiji_roles_swap_every_three_bouts():
+    roles = [engine.kaiji_role(bout, "Slave") for bout in range(engine.KAIJI_BOUTS)]
+    assert roles == (["Slave"] * 3 + ["Emperor"] * 3) * 2
+
+
+def test_kaiji_settle():
+    match = engine.new_kaiji_match(10)
+    match = engine.kaiji_settle(match, "Slave", 2, engine.PLAYER)
+    assert match == (1, 10, 2 * engine.KAIJI_PAYOUT["Slave"])
+    match = engine.kaiji_settle(match, "Emperor", 4, engine.CPU)
+    assert match == (2, 6, 10)
+    with pytest.raises(ValueError):
+        engine.kaiji_settle(match, "Emperor", 7, engine.CPU)
+    match = engine.kaiji_settle(match, "Emperor", 6, engine.CPU)
+    assert engine.kaiji_over(match)
+    assert engine.kaiji_result(match) == 0
@@ -0,0 +1,62 @@
+from PIL import Image
+
+import flipcache
+import mipcache
+from flipcache import FlipFrameCache, flip_frames
+
+CARDS = ("Emperor", "Citizen", "Slave")
+
+
+def make_cache(max_entries=16):
+    images = {name: Image.new("RGB", mipcache.BASE_SIZE) for name in ("Back",) + CARDS}
+    return FlipFrameCache(images, max_entries, scale=lambda name, size: images[name].resize(size))
+
+
+def warm_size(cache, size):
+    cache.warm([("Back", name, 8, size) for name in CARDS]).join()
+
+
+def test_flip_frames_shrink_then_grow():
+    back, card = Image.new("RGB", (120, 180)), Image.new("RGB", (120, 180))
+    widths = [img.size[0] for img in flip_frames(back, card, 8)]
+    assert widths == [120, 105, 90, 75, 60, 45, 30, 15, 15, 30, 45, 60, 75, 90, 105, 120]
+
+
+def test_pending_flips_share_the_bound():
+    cache = make_cache(max_entries=4)
+    for k in range(10, 31):
+        warm_size(cache, mipcache.scaled_size(k / 10))
+    stats = cache.stats()
+    assert stats["pending"] == 4
+    assert stats["evicted"] == 21 * 3 - 4
+    assert stats["bytes"] == sum(cache._bytes.values())
+
+
+def test_retain_drops_other_sizes():
+    cache = make_cache()
+    for k in range(10, 31):
+        size = mipcache.scaled_size(k / 10)
+        cache.retain(size)
+        warm_size(cache, size)
+    last = mipcache.scaled_size(3.0)
+    assert {key[3] for key in cache._pending} == {last}
+    assert cache.stats()["pending"] == 3
+    assert cache.bytes == sum(sum(img.size[0] * img.size[1] * 4 for img in frames)
+                              for frames in cache._pending.values())
+    # A warm-up still running for an old size lands after the resize and is dropped
+    warm_size(cache, mipcache.scaled_size(2.0))
+    assert cache.stats()["pending"] == 3
+
+
+def test_get_counts_warmed_flips_as_hits(monkeypatch):
+    # PhotoImages need a Tk root; the counters do not care what get() hands back
+    monkeypatch.setattr(flipcache.ImageTk, "PhotoImage", lambda img: img)
+    cache = make_cache()
+    size = mipcache.BASE_SIZE
+    warm_size(cache, size)
+    cache.get("Back", "Emperor", 8, size)  # warmed: only the PhotoImages are made
+    cache.get("Back", "Emperor", 8, size)  # ready
+    cache.get("Emperor", "Back", 8, size)  # never warmed: built here
+    stats = cache.stats()
+    assert (stats["hits"], stats["warm_hits"], stats["misses"]) == (2, 1, 1)
+    assert (stats["entries"], stats["pending"]) == (2, 2)
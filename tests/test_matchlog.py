@@ -0,0 +1,141 @@
+import os
+import random
+
+import analytics
+import engine
+import matchlog
+from matchlog import INDEX, RECORD
+
+
+def play_matches(log, count, rng):
+    # Log count random matches and return them as last_matches() decodes them
+    matches = []
+    for _ in range(count):
+        role = rng.choice(engine.ROLES)
+        state = engine.new_match(role)
+        log.start_match(role)
+        rounds = []
+        while not engine.is_over(state):
+            player = engine.random_player_card(state, rng)
+            cpu = engine.random_cpu_card(state, rng)
+            state, outcome = engine.step(state, player, cpu)
+            log.log_round(player, cpu, outcome)
+            rounds.append((player, cpu, outcome))
+        log.end_match(outcome)
+        matches.append({"session": log.session, "match": log.match, "role": role,
+                        "hand_size": engine.HAND_SIZE, "rounds": rounds, "outcome": outcome,
+                        "abandoned": False})
+    return matches
+
+
+def write_log(path, count, seed=0, sync_every=64):
+    log = matchlog.MatchLog(path, sync_every)
+    matches = play_matches(log, count, random.Random(seed))
+    log.close()
+    return matches
+
+
+def test_round_trip_and_sessions(tmp_path):
+    path = str(tmp_path / "matches.log")
+    first = write_log(path, 20)
+    log = matchlog.MatchLog(path)
+    assert log.last_matches(20) == first
+    assert log.last_matches(5) == first[-5:]
+    second = play_matches(log, 3, random.Random(1))
+    assert {m["session"] for m in second} == {first[0]["session"] + 1}
+    assert log.last_matches(100) == first + second
+    log.close()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    path = str(tmp_path / "matches.log")
+    matches = write_log(path, 10)
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b"\x02\x11\x01\x00")  # a record with a bad check byte
+        f.write(b"\x03\x01")  # half a record
+    log = matchlog.MatchLog(path)
+    assert os.path.getsize(path) == size
+    assert log.last_matches(10) == matches
+    log.close()
+
+
+def test_index_past_the_log_is_dropped(tmp_path):
+    path = str(tmp_path / "matches.log")
+    matches = write_log(path, 10)
+    # Lose the last match's records but keep its index entry, as if only the index was synced
+    with open(path + ".idx", "rb") as f:
+        last_offset = INDEX.unpack(f.read()[-INDEX.size:])[2]
+    with open(path, "r+b") as f:
+        f.truncate(last_offset)
+    log = matchlog.MatchLog(path)
+    assert os.path.getsize(path + ".idx") == 9 * INDEX.size
+    assert log.last_matches(10) == matches[:9]
+    log.close()
+
+
+def test_unindexed_matches_are_reindexed(tmp_path):
+    path = str(tmp_path / "matches.log")
+    matches = write_log(path, 10)
+    with open(path + ".idx", "r+b") as f:
+        f.truncate(6 * INDEX.size)
+    log = matchlog.MatchLog(path)
+    assert os.path.getsize(path + ".idx") == 10 * INDEX.size
+    assert log.last_matches(10) == matches
+    log.close()
+
+
+def test_reindexed_matches_keep_their_session(tmp_path):
+    path = str(tmp_path / "matches.log")
+    first = write_log(path, 10)
+    log = matchlog.MatchLog(path)
+    second = play_matches(log, 5, random.Random(1))
+    log.close()
+    # The crash lost the index tail from inside the first session through all of the second
+    with open(path + ".idx", "r+b") as f:
+        f.truncate(8 * INDEX.size)
+    log = matchlog.MatchLog(path)
+    assert log.last_matches(15) == first + second
+    assert [m["match"] for m in log.last_matches(5)] == [1, 2, 3, 4, 5]
+    assert log.session == second[0]["session"] + 1
+    log.close()
+
+
+def test_iter_records_skips_bad_records(tmp_path):
+    path = str(tmp_path / "matches.log")
+    write_log(path, 5)
+    good = os.path.getsize(path) // RECORD.size
+    with open(path, "ab") as f:
+        f.write(b"\x02\x00\x00\x00")
+    records = list(matchlog.iter_records(path, chunk_records=7))
+    assert len(records) == good
+    assert [offset for offset, *_ in records] == list(range(0, good * RECORD.size, RECORD.size))
+
+
+def test_analytics_workers_match_a_single_pass(tmp_path):
+    path = str(tmp_path / "matches.log")
+    write_log(path, 300, sync_every=16)
+    single = analytics.run([path]).to_dict()
+    assert single["matches"] == 300
+    assert analytics.run([path], workers=3).to_dict() == single
+
+
+def test_analytics_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "matches.log")
+    checkpoint = str(tmp_path / "stats.ckpt")
+    write_log(path, 50)
+    analytics.run([path], checkpoint)
+    # A later session appends more matches, one of them left unfinished when the game closed
+    log = matchlog.MatchLog(path)
+    play_matches(log, 30, random.Random(2))
+    log.start_match("Slave")
+    log.log_round(engine.CITIZEN, engine.CITIZEN, engine.DRAW)
+    log.close()
+    analytics.run([path], checkpoint)
+    log = matchlog.MatchLog(path)
+    play_matches(log, 5, random.Random(3))
+    log.close()
+    resumed = analytics.run([path], checkpoint).to_dict()
+    assert resumed == analytics.run([path]).to_dict()
+    assert resumed["matches"] == 86
+    assert resumed["abandoned"] == 1
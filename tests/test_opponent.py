@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+import engine
+import opponent
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "opponent.json")
+    model = opponent.OpponentModel()
+    state = engine.new_match("Emperor")
+    model.observe(state, engine.EMPEROR)
+    model.observe(state, engine.CITIZEN)
+    model.save(path)
+    assert opponent.OpponentModel.load(path).counts == model.counts
+
+
+@pytest.mark.parametrize("counts", [
+    {"Emperor": [[0, 0]] * engine.HAND_SIZE},
+    {"Emperor": [[0, 0]] * engine.HAND_SIZE, "Slave": [[0, 0]] * 2},
+    {"Emperor": [[0, 0]] * engine.HAND_SIZE, "Slave": [[0]] * engine.HAND_SIZE},
+    {"Emperor": [[0, 0]] * engine.HAND_SIZE, "Slave": [["1", 2]] * engine.HAND_SIZE},
+    [[0, 0]],
+])
+def test_malformed_counts_start_a_fresh_model(tmp_path, counts):
+    path = tmp_path / "opponent.json"
+    path.write_text(json.dumps({"version": 1, "hand_size": engine.HAND_SIZE, "counts": counts}))
+    model = opponent.OpponentModel.load(str(path))
+    assert model.counts == opponent.OpponentModel().counts
+    model.observe(engine.new_match("Slave"), engine.SLAVE)  # must not raise mid-game
+
+
+def test_non_object_file_starts_a_fresh_model(tmp_path):
+    path = tmp_path / "opponent.json"
+    path.write_text("[1, 2, 3]")
+    assert opponent.OpponentModel.load(str(path)).counts == opponent.OpponentModel().counts
+
+
+def test_other_hand_sizes_learn_in_their_own_file(tmp_path):
+    assert opponent.model_name() == opponent.DEFAULT_NAME
+    path = str(tmp_path / opponent.model_name(7))
+    model = opponent.OpponentModel.load(path, 7)
+    state = engine.new_match("Slave", 7)
+    model.observe(state, engine.SLAVE)  # 6 Citizens: past the end of a default-sized model
+    model.save(path)
+    assert opponent.OpponentModel.load(path, 7).counts == model.counts
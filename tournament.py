@@ -0,0 +1,212 @@
+"""Round-robin bot-vs-bot tournament across a process pool.
+
+Every pair of bots plays the same number of matches, alternating who holds
+the Emperor. The work is cut into fixed-size blocks and each block seeds its
+own RNG from (seed, pair, block), so the totals are identical whatever the
+worker count. Blocks are streamed back as they finish and merged into a
+ranking by score (win = 1, draw = 1/2) with a 95% confidence interval.
+
+A bot is anything with ``cpu_card(state, rng)``; bots that also have
+``observe(state, player_card)`` (opponent.OpponentModel) learn as they play,
+starting fresh in every block. The first bot of a pair sits in the player
+seat and sees the board through engine.swap_sides().
+
+    python tournament.py --matches 200000 --workers 8
+    python tournament.py random equilibrium adaptive --json standings.json
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+import engine
+import opponent
+import solver
+
+DEFAULT_BLOCK = 20_000
+
+
+class RandomBot:
+    # Uniform over the hand, like random.choice(cpu_hand) in the original play_round
+    def cpu_card(self, state, rng=random):
+        return engine.random_cpu_card(state, rng)
+
+
+class ScriptedBot:
+    def __init__(self, special_first):
+        self.special_first = special_first
+
+    def cpu_card(self, state, rng=random):
+        _, _, citizens, special = engine.counts(state)
+        if special and (self.special_first or not citizens):
+            return engine.special_card(engine.cpu_role(state))
+        return engine.CITIZEN
+
+
+# name -> factory(hand_size)
+BOTS = {
+    "random": lambda hand_size: RandomBot(),
+    "special-first": lambda hand_size: ScriptedBot(True),
+    "special-last": lambda hand_size: ScriptedBot(False),
+    "equilibrium": solver.StrategyTable.solved,
+    "adaptive": opponent.OpponentModel,
+}
+
+
+def play_match(first, second, first_role, hand_size, rng):
+    """Play one match, first bot in the player seat; returns the engine outcome."""
+    first_observe = getattr(first, "observe", None)
+    second_observe = getattr(second, "observe", None)
+    state = engine.new_match(first_role, hand_size)
+    while True:
+        mirrored = engine.swap_sides(state)
+        a = first.cpu_card(mirrored, rng)
+        b = second.cpu_card(state, rng)
+        if first_observe:
+            first_observe(mirrored, b)
+        if second_observe:
+            second_observe(state, a)
+        state, outcome = engine.step(state, a, b)
+        if engine.is_over(state):
+            return outcome
+
+
+def play_block(task):
+    # One unit of work: (seed, first, second, block, matches, hand_size) -> counts and timing
+    seed, first_name, second_name, block, matches, hand_size = task
+    rng = random.Random(f"{seed}/{first_name}/{second_name}/{block}")
+    first = BOTS[first_name](hand_size)
+    second = BOTS[second_name](hand_size)
+    counts = [0, 0, 0]  # indexed by engine outcome: draw, first wins, second wins
+    start = time.perf_counter()
+    for i in range(matches):
+        counts[play_match(first, second, engine.ROLES[i & 1], hand_size, rng)] += 1
+    return first_name, second_name, counts, os.getpid(), time.perf_counter() - start
+
+
+def make_tasks(names, matches, hand_size, seed, block=DEFAULT_BLOCK):
+    tasks = []
+    for first, second in itertools.combinations(names, 2):
+        for index, start in enumerate(range(0, matches, block)):
+            tasks.append((seed, first, second, index, min(block, matches - start), hand_size))
+    return tasks
+
+
+class Standings:
+    def __init__(self, names):
+        self.names = list(names)
+        self.results = {name: [0, 0, 0] for name in names}  # [wins, draws, losses]
+        self.head_to_head = {}  # (first, second) -> [first wins, draws, second wins]
+        self.workers = {}  # pid -> [matches, seconds]
+        self.seconds = 0.0  # wall time of the whole run
+
+    def add(self, first, second, counts, pid=None, seconds=0.0):
+        draws, first_wins, second_wins = counts
+        for name, wins, losses in ((first, first_wins, second_wins), (second, second_wins, first_wins)):
+            row = self.results[name]
+            row[0] += wins
+            row[1] += draws
+            row[2] += losses
+        pair = self.head_to_head.setdefault((first, second), [0, 0, 0])
+        pair[0] += first_wins
+        pair[1] += draws
+        pair[2] += second_wins
+        if pid is not None:
+            worker = self.workers.setdefault(pid, [0, 0.0])
+            worker[0] += sum(counts)
+            worker[1] += seconds
+
+    def ranking(self):
+        # [(name, score, half-width of the 95% interval, matches)], best first
+        rows = []
+        for name in self.names:
+            wins, draws, losses = self.results[name]
+            n = wins + draws + losses
+            if not n:
+                rows.append((name, 0.0, 0.0, 0))
+                continue
+            score = (wins + 0.5 * draws) / n
+            variance = (wins + 0.25 * draws) / n - score * score
+            rows.append((name, score, 1.96 * math.sqrt(max(variance, 0.0) / n), n))
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows
+
+    def worker_rates(self):
+        return {pid: matches / seconds if seconds else 0.0 for pid, (matches, seconds) in self.workers.items()}
+
+    def to_dict(self):
+        return {
+            "ranking": [{"bot": name, "score": score, "ci95": ci, "matches": n}
+                        for name, score, ci, n in self.ranking()],
+            "head_to_head": [{"first": a, "second": b, "first_wins": w, "draws": d, "second_wins": l}
+                             for (a, b), (w, d, l) in sorted(self.head_to_head.items())],
+            "matches_per_sec_by_worker": list(self.worker_rates().values()),
+        }
+
+
+def run(names, matches, workers=1, seed=0, hand_size=engine.HAND_SIZE, block=DEFAULT_BLOCK, on_block=None):
+    """Play every pair `matches` times; on_block(standings, done, total) sees partial results."""
+    tasks = make_tasks(names, matches, hand_size, seed, block)
+    standings = Standings(names)
+    start = time.perf_counter()
+    if workers > 1:
+        pool = Pool(workers)
+        results = pool.imap_unordered(play_block, tasks)
+    else:
+        pool = None
+        results = map(play_block, tasks)
+    try:
+        for done, (first, second, counts, pid, seconds) in enumerate(results, 1):
+            standings.add(first, second, counts, pid, seconds)
+            if on_block:
+                on_block(standings, done, len(tasks))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    standings.seconds = time.perf_counter() - start
+    return standings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round-robin tournament between CPU policies")
+    parser.add_argument("bots", nargs="*", default=list(BOTS), help=f"from {', '.join(BOTS)}")
+    parser.add_argument("--matches", type=int, default=100_000, help="matches per pair")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hand-size", type=int, default=engine.HAND_SIZE)
+    parser.add_argument("--block", type=int, default=DEFAULT_BLOCK, help="matches per task")
+    parser.add_argument("--json", help="write the standings here")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.bots if name not in BOTS]
+    if unknown or len(args.bots) < 2:
+        parser.error(f"need at least two bots from {', '.join(BOTS)}")
+
+    def progress(standings, done, total):
+        leader, score, ci, _ = standings.ranking()[0]
+        print(f"\r{done}/{total} blocks  leader {leader} {score:.4f} ±{ci:.4f}", end="", file=sys.stderr)
+
+    standings = run(args.bots, args.matches, args.workers, args.seed, args.hand_size, args.block, progress)
+    print(file=sys.stderr)
+    total = sum(sum(counts) for counts in standings.head_to_head.values())
+    for rank, (name, score, ci, n) in enumerate(standings.ranking(), 1):
+        print(f"{rank}. {name:<14} {score:.4f} ±{ci:.4f}  ({n} matches)")
+    for (first, second), (wins, draws, losses) in sorted(standings.head_to_head.items()):
+        print(f"   {first} vs {second}: {wins}-{draws}-{losses}")
+    rates = sorted(standings.worker_rates().values())
+    print(f"{total} matches in {standings.seconds:.2f}s ({total / standings.seconds:,.0f} matches/s); "
+          f"per worker {rates[0]:,.0f}-{rates[-1]:,.0f} matches/s over {len(rates)} workers")
+    if args.json:
+        result = standings.to_dict()
+        result.update(seconds=standings.seconds, matches=total, seed=args.seed, hand_size=args.hand_size)
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()